@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'finance_tools'))
+from script_csv_to_json import iter_events, run_conversion
+
+# Valeurs piégeuses : NaN / Infinity dans des chaînes, séparateurs et guillemets échappés
+TRICKY_STRINGS = ['Buy, NaN]', 'Infinity', '-Infinity}', 'say "NaN", then ]', 'back\\slash', 'NaN']
+
+
+def make_analysis(n_tickers, n_rows, seed=0):
+    """
+    Fichier d'analyse synthétique au format de main.py, avec des NaN / ±Infinity
+    en valeurs et dans les chaînes.
+    """
+    rng = random.Random(seed)
+    special = [float('nan'), float('inf'), float('-inf')]
+    data = {}
+    for t in range(n_tickers):
+        indicators = [{
+            'date': f'2024-01-{(i % 28) + 1:02d}',
+            'RSI': rng.choice(special) if i % 17 == 0 else round(rng.uniform(0, 100), 4),
+            'MACD': rng.uniform(-5, 5),
+            'signal': rng.choice(TRICKY_STRINGS) if i % 5 == 0 else 'Hold',
+            # Entiers seuls, entiers mêlés de flottants, entiers avec valeurs manquantes
+            'volume': rng.randint(0, 10**6),
+            'score': rng.randint(0, 9) if i % 3 else rng.uniform(0, 9),
+            'count': None if i % 11 == 0 else rng.randint(0, 50),
+        } for i in range(n_rows)]
+        # Colonne apparue en cours de fichier, absente des lignes précédentes
+        for indicator in indicators[n_rows // 2:]:
+            indicator['late'] = rng.randint(0, 5)
+        anomalies = [{'date': f'2024-02-{(i % 28) + 1:02d}', 'note': rng.choice(TRICKY_STRINGS),
+                      'zscore': rng.choice(special)} for i in range(n_rows // 10)]
+        data[f'T{t:03d}'] = {'indicators': indicators, 'anomalies': anomalies}
+    return data
+
+
+def old_conversion(input_json, indicators_csv, anomalies_csv):
+    """
+    Conversion d'origine : json.load puis DataFrame pandas.
+    """
+    with open(input_json, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    indicators, anomalies = [], []
+    for ticker, content in data.items():
+        for indicator in content.get('indicators', []):
+            indicator.pop('date', None)
+            indicator['ticker'] = ticker
+            indicators.append(indicator)
+        for anomaly in content.get('anomalies', []):
+            anomaly['ticker'] = ticker
+            anomalies.append(anomaly)
+    for records, output in ((indicators, indicators_csv), (anomalies, anomalies_csv)):
+        df = pd.DataFrame(records)
+        df.where(pd.notnull(df), None).to_csv(output, index=False, encoding='utf-8')
+
+
+def check_filter(json_file):
+    """
+    Le filtre, quelle que soit la taille des blocs, ne modifie que les valeurs non finies.
+    """
+    # NaN != NaN : comparaison sur la représentation des valeurs
+    expected = [(prefix, event, repr(value)) for prefix, event, value in iter_events(json_file)]
+    for block_size in (1, 2, 3, 7, 64):
+        events = [(prefix, event, repr(value)) for prefix, event, value in iter_events(json_file, block_size)]
+        assert events == expected, f"événements différents avec des blocs de {block_size} octets"
+    strings = {value for _, event, value in iter_events(json_file) if event == 'string'}
+    assert set(TRICKY_STRINGS) <= strings, "chaînes modifiées par le filtre"
+
+
+def check_failures(tmp_dir, input_json):
+    """
+    Une entrée absente ou invalide laisse les CSV existants intacts, sans fichier temporaire.
+    """
+    paths = [os.path.join(tmp_dir, f'existing_{kind}.csv') for kind in ('indicators', 'anomalies')]
+    run_conversion(input_json, *paths)
+    before = [open(path, encoding='utf-8').read() for path in paths]
+    invalid_json = os.path.join(tmp_dir, 'invalid.json')
+    with open(input_json, 'r', encoding='utf-8') as source, open(invalid_json, 'w', encoding='utf-8') as target:
+        target.write(source.read()[:len(before[0])])
+    for bad_input in (os.path.join(tmp_dir, 'missing.json'), invalid_json):
+        run_conversion(bad_input, *paths)
+        after = [open(path, encoding='utf-8').read() for path in paths]
+        assert after == before, f"CSV existants modifiés par {os.path.basename(bad_input)}"
+    leftovers = [name for name in os.listdir(tmp_dir) if name.endswith('.tmp')]
+    assert not leftovers, f"fichiers temporaires restants : {leftovers}"
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_json = os.path.join(tmp_dir, 'analysis_output.json')
+        with open(input_json, 'w', encoding='utf-8') as file:
+            json.dump(make_analysis(50, 2000), file, indent=4)
+        small_json = os.path.join(tmp_dir, 'small.json')
+        with open(small_json, 'w', encoding='utf-8') as file:
+            json.dump(make_analysis(2, 100), file)
+        check_filter(small_json)
+        check_failures(tmp_dir, small_json)
+
+        outputs = {}
+        for name, convert in (('pandas (ancienne)', old_conversion), ('flux ijson', run_conversion)):
+            paths = [os.path.join(tmp_dir, f'{name}_{kind}.csv') for kind in ('indicators', 'anomalies')]
+            started = time.perf_counter()
+            convert(input_json, *paths)
+            elapsed = time.perf_counter() - started
+            outputs[name] = [open(path, encoding='utf-8').read() for path in paths]
+            print(f"{name:20} {elapsed:>8.3f} s")
+
+        identical = outputs['pandas (ancienne)'] == outputs['flux ijson']
+        print(f"CSV identiques : {'oui' if identical else 'NON'}")
+        if not identical:
+            sys.exit(1)
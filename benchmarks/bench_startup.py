@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import subprocess
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Chaque cas est exécuté dans un interpréteur neuf pour mesurer un démarrage à froid
+CASES = {
+    'import main': "import main",
+    'import walk_forward, hyperparameter_search': "import walk_forward, hyperparameter_search",
+    'import main + tensorflow (ancien coût)': "import main; import tensorflow.keras",
+}
+
+PROBE = """
+import sys, time, json, resource
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'tensorflow_loaded': 'tensorflow' in sys.modules,
+    'sklearn_loaded': 'sklearn' in sys.modules,
+}}))
+"""
+
+
+def measure(statement, repeat=5):
+    """
+    Lance `statement` `repeat` fois dans un processus Python neuf et retourne
+    la médiane du temps d'import et le pic de mémoire résidente.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(statement=statement)],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'},
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        'seconds': statistics.median(r['seconds'] for r in runs),
+        'max_rss_mb': max(r['max_rss_mb'] for r in runs),
+        'tensorflow_loaded': runs[0]['tensorflow_loaded'],
+        'sklearn_loaded': runs[0]['sklearn_loaded'],
+    }
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'cas':45} {'temps (s)':>10} {'RSS max (Mo)':>13} {'TF':>4} {'sklearn':>8}")
+    for name, statement in CASES.items():
+        result = measure(statement, repeat)
+        print(f"{name:45} {result['seconds']:>10.3f} {result['max_rss_mb']:>13.1f} "
+              f"{'oui' if result['tensorflow_loaded'] else 'non':>4} "
+              f"{'oui' if result['sklearn_loaded'] else 'non':>8}")
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Chaque variante tourne dans un processus neuf pour que le pic RSS lui soit propre
+PROBE = """
+import sys, time, json, resource
+import numpy as np
+sys.path.insert(0, {root!r})
+from main import make_windows
+
+rows, window_size, variant = {rows}, {window_size}, {variant!r}
+data = np.random.default_rng(0).random((rows, 8))
+baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+
+if variant == 'boucle (ancienne)':
+    X, y = [], []
+    for i in range(window_size, len(data)):
+        X.append(data[i-window_size:i])
+        y.append(data[i, 0])
+    X, y = np.array(X), np.array(y)
+elif variant == 'vues float32':
+    scaled = data.astype(np.float32)
+    X, y = make_windows(scaled, window_size), scaled[window_size:, 0]
+    X.sum()
+else:
+    scaled = data.astype(np.float32)
+    out = np.empty((rows - window_size, window_size, 8), dtype=np.float32)
+    X, y = make_windows(scaled, window_size, out=out), scaled[window_size:, 0]
+
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'seconds': elapsed,
+    'peak_rss_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024,
+    'x_mb': X.nbytes / 2**20,
+}}))
+"""
+
+VARIANTS = ['boucle (ancienne)', 'vues float32', 'float32 matérialisé']
+
+
+def measure(rows, window_size, variant):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(root=ROOT_DIR, rows=rows, window_size=window_size, variant=variant)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    window_size = 60
+    for rows in [1_000, 10_000, 100_000]:
+        print(f"\n{rows} lignes, fenêtre de {window_size}:")
+        print(f"{'variante':22} {'temps (s)':>10} {'pic RSS (Mo)':>13}")
+        for variant in VARIANTS:
+            result = measure(rows, window_size, variant)
+            print(f"{variant:22} {result['seconds']:>10.4f} {result['peak_rss_mb']:>13.1f}")
@@ -1,37 +1,37 @@
+import os
 import sys
-import yfinance as yf
 import json
 from datetime import datetime
 
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+from market_client import get_ticker
+from schema import apply_schema, from_history, memory_footprint, to_records
+
 def main():
     print("Testing implementation for table: economic_data")
     etf_list = ['SPY', 'QQQ', 'EEM']
     start_date = '2020-01-01'
     end_date = datetime.today().strftime('%Y-%m-%d')
-    all_data = []
+    tables = []
 
     for ticker in etf_list:
         print(f"Récupération des données pour {ticker}")
-        etf = yf.Ticker(ticker)
+        etf = get_ticker(ticker)
         historical_data = etf.history(start=start_date, end=end_date, interval='1d')
         if historical_data.empty:
             print(f"Aucune donnée trouvée pour {ticker}")
             continue
-        historical_data = historical_data.reset_index()
-        for index, row in historical_data.iterrows():
-            data_point = {
-                'ticker': ticker,
-                'date': row['Date'].strftime('%Y-%m-%d'),
-                'datetime': row['Date'].strftime('%Y-%m-%d %H:%M:%S'),
-                'open_price': row['Open'],
-                'close_price': row['Close'],
-                'high_price': row['High'],
-                'low_price': row['Low'],
-                'volume': int(row['Volume'])
-            }
-            all_data.append(data_point)
+        tables.append(from_history(historical_data, ticker, 'economic_data'))
+    if not tables:
+        print("Aucune donnée à enregistrer.")
+        return
+    # Les catégories de ticker diffèrent d'un ETF à l'autre : le schéma les réunit
+    all_data = apply_schema(pd.concat(tables, ignore_index=True), 'economic_data')
+    print(f"{len(all_data)} lignes, {memory_footprint(all_data) / 1024 ** 2:.2f} Mo en mémoire")
     with open('economic_data.json', 'w') as json_file:
-        json.dump(all_data, json_file, indent=4, ensure_ascii=False, default=str)
+        json.dump(to_records(all_data), json_file, indent=4, ensure_ascii=False, default=str)
 
     print("Données enregistrées dans le fichier 'economic_data.json'.")
 
@@ -0,0 +1,221 @@
+import os
+import sys
+import glob
+import json
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+from schema import DATE_FORMAT, apply_schema, from_epoch, to_epoch
+from table_io import PARQUET, load_table, write_table
+
+# Barres OHLCV (5m, 15m, 1h, journalières) construites à partir des points minute
+# du collecteur. Chaque unité de temps est une partition :
+#   bars/timeframe=5m/date=2024-10-08/bars.parquet
+# Les barres intraday commencent sur un multiple de leur durée (à l'heure du marché :
+# le décalage New York / UTC est un nombre entier d'heures) ; une barre journalière
+# commence à minuit, heure du marché.
+TIMEFRAMES = {
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '1h': 60 * 60,
+    '1d': None,
+}
+
+BARS_DIR = 'bars'
+TICK_TABLE = 'etf_market_data'
+BAR_TABLE = 'etf_market_bars'
+
+def bar_starts(timestamps, timeframe):
+    """
+    Début de la barre de chaque horodatage (secondes epoch).
+    """
+    seconds = TIMEFRAMES[timeframe]
+    if seconds is None:
+        return to_epoch(from_epoch(timestamps).dt.normalize())
+    return timestamps - timestamps % seconds
+
+def aggregate(rows, timeframe):
+    """
+    Agrège des lignes OHLCV (points minute ou barres déjà construites) en barres de
+    `timeframe`. Les lignes sont triées par ticker puis par date : chaque barre est
+    un bloc contigu, réduit d'un seul coup pour toutes les barres (reduceat).
+    À horodatage égal, l'ordre des lignes est conservé (la plus ancienne d'abord).
+    """
+    codes = rows['ticker'].cat.codes.to_numpy()
+    timestamps = rows['timestamp'].to_numpy()
+    order = np.lexsort((timestamps, codes))
+    codes = codes[order]
+    starts = bar_starts(timestamps[order], timeframe)
+
+    boundary = np.empty(len(order), dtype=bool)
+    boundary[:1] = True
+    boundary[1:] = (codes[1:] != codes[:-1]) | (starts[1:] != starts[:-1])
+    first = np.flatnonzero(boundary)
+    last = np.append(first[1:], len(order)) - 1
+
+    def column(name):
+        return rows[name].to_numpy()[order]
+
+    tick_count = column('tick_count') if 'tick_count' in rows.columns else np.ones(len(order), dtype=np.int64)
+    bars = pd.DataFrame({
+        'ticker': pd.Categorical.from_codes(codes[first], categories=rows['ticker'].cat.categories),
+        'timeframe': timeframe,
+        'timestamp': starts[first],
+        'open_price': column('open_price')[first],
+        'close_price': column('close_price')[last],
+        'high_price': np.fmax.reduceat(column('high_price'), first),
+        'low_price': np.fmin.reduceat(column('low_price'), first),
+        'volume': np.add.reduceat(column('volume'), first),
+        'tick_count': np.add.reduceat(tick_count, first),
+    })
+    return apply_schema(bars, BAR_TABLE)
+
+def bar_days(bars):
+    """
+    Jour (heure du marché) de chaque barre : la partition qui la contient.
+    """
+    codes, instants = pd.factorize(bars['timestamp'].to_numpy())
+    return from_epoch(instants).dt.strftime(DATE_FORMAT).to_numpy()[codes]
+
+class BarEngine:
+    """
+    Construit les barres de plusieurs unités de temps au fil des points minute
+    (`update`) ou sur un historique complet (`rebuild`).
+
+    Les partitions des jours en cours restent en mémoire : une mise à jour fusionne
+    les nouvelles barres avec celles du jour sans relire le disque. Le dernier point
+    traité de chaque ticker est enregistré, un point déjà agrégé est ignoré.
+    """
+
+    def __init__(self, directory=BARS_DIR, timeframes=tuple(TIMEFRAMES)):
+        unknown = set(timeframes) - set(TIMEFRAMES)
+        if unknown:
+            raise ValueError(f"Unités de temps inconnues: {', '.join(sorted(unknown))}")
+        self.directory = directory
+        self.timeframes = list(timeframes)
+        self.state_file = os.path.join(directory, 'bars_state.json')
+        self.last_tick = self.load_state()
+        self.partitions = {}
+
+    def load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as json_file:
+                return json.load(json_file)['last_tick']
+        except FileNotFoundError:
+            return {}
+
+    def save_state(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_file = self.state_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as json_file:
+            json.dump({'last_tick': self.last_tick}, json_file, indent=4)
+        os.replace(tmp_file, self.state_file)
+
+    def partition_path(self, timeframe, day):
+        return os.path.join(self.directory, f'timeframe={timeframe}', f'date={day}', 'bars.parquet')
+
+    def load_partition(self, timeframe, day):
+        key = (timeframe, day)
+        if key not in self.partitions:
+            path = self.partition_path(timeframe, day)
+            self.partitions[key] = load_table(path, BAR_TABLE) if os.path.exists(path) else None
+        return self.partitions[key]
+
+    def write_partition(self, timeframe, day, bars):
+        path = self.partition_path(timeframe, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_table(bars, path, file_format=PARQUET)
+        self.partitions[(timeframe, day)] = bars
+
+    def current_bars(self, timeframe):
+        """
+        Barres du dernier jour en mémoire pour `timeframe` (None si aucune).
+        """
+        days = [day for tf, day in self.partitions if tf == timeframe and self.partitions[(tf, day)] is not None]
+        return self.partitions[(timeframe, max(days))] if days else None
+
+    def new_ticks(self, ticks):
+        """
+        Points postérieurs au dernier point traité de leur ticker.
+        """
+        last = ticks['ticker'].astype(object).map(self.last_tick).fillna(-1).to_numpy()
+        return ticks[ticks['timestamp'].to_numpy() > last]
+
+    def record_last_ticks(self, ticks):
+        latest = ticks.groupby('ticker', observed=True)['timestamp'].max()
+        self.last_tick.update({str(ticker): int(timestamp) for ticker, timestamp in latest.items()})
+        self.save_state()
+
+    def update(self, ticks):
+        """
+        Ajoute des points minute (DataFrame ou liste d'enregistrements du collecteur)
+        aux barres de chaque unité de temps. Retourne le nombre de points agrégés.
+        """
+        ticks = self.new_ticks(apply_schema(pd.DataFrame(ticks), TICK_TABLE))
+        if ticks.empty:
+            return 0
+        for timeframe in self.timeframes:
+            bars = aggregate(ticks, timeframe)
+            days = bar_days(bars)
+            for day in np.unique(days):
+                day_bars = bars[days == day]
+                existing = self.load_partition(timeframe, day)
+                if existing is not None:
+                    day_bars = aggregate(apply_schema(pd.concat([existing, day_bars], ignore_index=True), BAR_TABLE),
+                                         timeframe)
+                self.write_partition(timeframe, day, day_bars)
+            # Seul le dernier jour de chaque unité de temps reste en mémoire
+            latest = days.max()
+            for key in [key for key in self.partitions if key[0] == timeframe and key[1] < latest]:
+                del self.partitions[key]
+        self.record_last_ticks(ticks)
+        return len(ticks)
+
+    def rebuild(self, ticks):
+        """
+        Mode batch : recalcule toutes les barres d'un historique de points et
+        remplace les partitions correspondantes.
+        """
+        ticks = apply_schema(pd.DataFrame(ticks), TICK_TABLE)
+        ticks = ticks.drop_duplicates(subset=['ticker', 'timestamp'], keep='last', ignore_index=True)
+        self.partitions = {}
+        if ticks.empty:
+            return 0
+        for timeframe in self.timeframes:
+            bars = aggregate(ticks, timeframe)
+            days = bar_days(bars)
+            for day in np.unique(days):
+                self.write_partition(timeframe, day, bars[days == day].reset_index(drop=True))
+        self.partitions = {}
+        self.last_tick = {}
+        self.record_last_ticks(ticks)
+        return len(ticks)
+
+def load_ticks(patterns):
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        raise FileNotFoundError(f"Aucun fichier de points: {', '.join(patterns)}")
+    frames = [load_table(path, TICK_TABLE) for path in paths]
+    return apply_schema(pd.concat(frames, ignore_index=True), TICK_TABLE)
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Construit les barres OHLCV à partir des points minute enregistrés.")
+    parser.add_argument('--ticks', nargs='+', default=['real_time_data_*.json'], help="fichiers de points (glob)")
+    parser.add_argument('--output', default=BARS_DIR, help="répertoire des partitions de barres")
+    parser.add_argument('--timeframes', nargs='+', choices=list(TIMEFRAMES), default=list(TIMEFRAMES))
+    args = parser.parse_args()
+
+    try:
+        ticks = load_ticks(args.ticks)
+        count = BarEngine(args.output, args.timeframes).rebuild(ticks)
+        logging.info(f"{count} points agrégés en barres {', '.join(args.timeframes)} dans '{args.output}'.")
+    except Exception as e:
+        logging.error(f"Erreur lors de la construction des barres: {e}")
+
+if __name__ == "__main__":
+    main()
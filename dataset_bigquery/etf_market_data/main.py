@@ -1,15 +1,17 @@
+import os
 import sys
 import time
-import yfinance as yf
 import json
 import logging
 import threading
 from datetime import datetime
 from pytz import timezone
 from requests.exceptions import HTTPError, ConnectionError, Timeout
-import numpy as np
-import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+from market_client import fetch_all, get_ticker
+from schema import from_history, to_records
+from bars import BarEngine
 
 logging.basicConfig(
     level=logging.INFO,
@@ -49,23 +51,12 @@ def fetch_real_time_data(ticker, retries=3, delay=5):
                 logging.info("Le marché est fermé. Aucune donnée en temps réel disponible.")
                 return None
 
-            etf = yf.Ticker(ticker)
+            etf = get_ticker(ticker)
             data = etf.history(period='1d', interval='1m')
             if data.empty:
                 logging.warning(f"Aucune donnée en temps réel disponible pour {ticker}")
                 return None
-            latest_data = data.tail(1).iloc[0]
-
-            data_point = {
-                'ticker': ticker,
-                'date': latest_data.name.tz_convert(MARKET_TIMEZONE).strftime('%Y-%m-%d'),
-                'datetime': latest_data.name.tz_convert(MARKET_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
-                'open_price': float(latest_data['Open']),
-                'close_price': float(latest_data['Close']),
-                'high_price': float(latest_data['High']),
-                'low_price': float(latest_data['Low']),
-                'volume': int(latest_data['Volume']) if not pd.isna(latest_data['Volume']) else 0
-            }
+            data_point = to_records(from_history(data.tail(1), ticker, 'etf_market_data'))[0]
 
             logging.info(f"Données récupérées pour {ticker}: {data_point}")
 
@@ -82,16 +73,17 @@ def fetch_real_time_data(ticker, retries=3, delay=5):
     logging.error(f"Échec de la récupération des données pour {ticker} après {retries} tentatives.")
     return None
 
-def save_data(data_point):
+def save_data(data_point, directory='.'):
     """
-    Sauvegarde les données dans un fichier JSON sans duplications.
+    Sauvegarde les données dans le fichier JSON du jour du point, sans duplications.
     Utilise un verrou pour éviter les accès concurrents au fichier.
+    Retourne True si le point est nouveau.
     """
     if data_point is None:
-        return
+        return False
 
     try:
-        filename = f"real_time_data_{datetime.now(MARKET_TIMEZONE).strftime('%Y%m%d')}.json"
+        filename = os.path.join(directory, f"real_time_data_{data_point['date'].replace('-', '')}.json")
 
         with file_lock:
             try:
@@ -105,7 +97,7 @@ def save_data(data_point):
 
             if any(d['ticker'] == data_point['ticker'] and d['datetime'] == data_point['datetime'] for d in existing_data):
                 logging.info(f"Données déjà présentes pour {data_point['ticker']} à {data_point['datetime']}. Ignorées.")
-                return
+                return False
 
             existing_data.append(data_point)
 
@@ -113,17 +105,35 @@ def save_data(data_point):
                 json.dump(existing_data, json_file, indent=4, ensure_ascii=False)
 
             logging.info(f"Données sauvegardées dans le fichier {filename}")
+            return True
 
     except Exception as e:
         logging.error(f"Erreur lors de la sauvegarde des données: {e}")
+        return False
+
+def update_bars(engine, data_points):
+    """
+    Agrège les nouveaux points dans les barres 5m / 15m / 1h / journalières.
+    """
+    if not data_points:
+        return
+    try:
+        engine.update(data_points)
+    except Exception as e:
+        logging.error(f"Erreur lors de la mise à jour des barres: {e}")
 
-def process_ticker(ticker):
-    data_point = fetch_real_time_data(ticker)
-    if data_point:
-        save_data(data_point)
+def ingest(engine, data_points, directory='.'):
+    """
+    Sauvegarde les points d'un cycle puis met à jour les barres.
+    Retourne les points nouveaux.
+    """
+    new_points = [data_point for data_point in data_points if save_data(data_point, directory)]
+    update_bars(engine, new_points)
+    return new_points
 
 def main():
     logging.info("Démarrage du programme de récupération des données en temps réel")
+    engine = BarEngine()
 
     while True:
         if not is_market_open():
@@ -131,14 +141,9 @@ def main():
             time.sleep(60)
             continue
 
-        threads = []
-        for ticker in ETF_LIST:
-            thread = threading.Thread(target=process_ticker, args=(ticker,))
-            threads.append(thread)
-            thread.start()
-
-        for thread in threads:
-            thread.join()
+        # Pool et session partagés : les connexions restent ouvertes d'un cycle à l'autre
+        results = fetch_all(fetch_real_time_data, ETF_LIST)
+        ingest(engine, [data_point for data_point in results.values() if data_point])
 
         logging.info(f"Attente de {FETCH_INTERVAL} secondes avant la prochaine récupération")
         time.sleep(FETCH_INTERVAL)
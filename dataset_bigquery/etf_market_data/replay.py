@@ -0,0 +1,217 @@
+import os
+import sys
+import glob
+import fnmatch
+import json
+import time
+import shutil
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+# Racine du dépôt en dernier : son main.py ne doit pas masquer celui du collecteur
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..'))
+from schema import PRICE_SCHEMA, apply_schema, to_records
+from table_io import iter_chunks, load_table
+from bars import BarEngine
+from main import save_data
+from dataset_bigquery.technical_indicators.base_analysis import save_analysis
+from dataset_bigquery.technical_indicators.moving_averages import calculate_moving_averages
+from dataset_bigquery.technical_indicators.rsi import calculate_rsi
+
+# Rejoue des séances enregistrées (real_time_data_*.json ou tout historique de barres
+# au format des tables de prix) dans la chaîne du collecteur, sans marché ouvert ni
+# réseau : enregistrement des points, barres, indicateurs. Chaque instant de
+# l'historique forme un cycle, émis au rythme d'origine multiplié par `speed`
+# (speed=None : aussi vite que possible).
+TICK_TABLE = 'etf_market_data'
+INDICATOR_TIMEFRAME = '5m'
+STAGES = ['ingest', 'bars', 'indicators']
+
+# Fichiers écrits par un rejeu dans son répertoire (les seuls effacés par clear_output)
+OUTPUT_ARTIFACTS = ['real_time_data_*.json', 'bars', 'indicators_*.parquet']
+
+def load_history(patterns, tickers=None):
+    """
+    Points à rejouer, triés par instant puis par ticker. Les colonnes hors table de
+    prix (barres : timeframe, tick_count) sont ignorées.
+    """
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        raise FileNotFoundError(f"Aucun fichier à rejouer: {', '.join(patterns)}")
+    frames = [load_table(path, TICK_TABLE, tickers=tickers) for path in paths]
+    history = apply_schema(pd.concat(frames, ignore_index=True), TICK_TABLE)
+    history = history[[column for column in PRICE_SCHEMA if column in history.columns]]
+    history = history.drop_duplicates(subset=['ticker', 'timestamp'], keep='last')
+    return history.sort_values(['timestamp', 'ticker'], ignore_index=True)
+
+def iter_cycles(history):
+    """
+    (instant, points du collecteur) pour chaque instant de l'historique. Les
+    enregistrements sont construits par paquets de lignes.
+    """
+    pending, pending_time = [], None
+    for chunk in iter_chunks(history):
+        for timestamp, record in zip(chunk['timestamp'].to_numpy(), to_records(chunk)):
+            if timestamp != pending_time and pending:
+                yield pending_time, pending
+                pending = []
+            pending_time = timestamp
+            pending.append(record)
+    if pending:
+        yield pending_time, pending
+
+def compute_indicators(engine, timeframe=INDICATOR_TIMEFRAME):
+    """
+    SMA / EMA et RSI de chaque ticker sur les barres du jour en cours.
+    """
+    bars = engine.current_bars(timeframe)
+    if bars is None:
+        return None
+    results = []
+    for _, ticker_bars in bars.groupby('ticker', observed=True):
+        averages = calculate_moving_averages(ticker_bars.copy())
+        rsi = calculate_rsi(ticker_bars.copy())
+        if averages is not None and rsi is not None:
+            results.append(averages.merge(rsi, on=['ticker', 'timestamp']))
+    return pd.concat(results, ignore_index=True) if results else None
+
+def clear_output(output_dir):
+    """
+    Efface les fichiers d'un rejeu précédent dans `output_dir`. Refuse si le
+    répertoire contient autre chose : seul un répertoire de rejeu est vidé.
+    """
+    if not os.path.isdir(output_dir):
+        return
+    entries = set(os.listdir(output_dir))
+    artifacts = {name for pattern in OUTPUT_ARTIFACTS
+                 for name in fnmatch.filter(entries, pattern)}
+    others = entries - artifacts
+    if others:
+        raise FileExistsError(f"'{output_dir}' n'est pas un répertoire de rejeu "
+                              f"(contient {', '.join(sorted(others)[:5])}) : rien n'a été effacé")
+    for name in artifacts:
+        path = os.path.join(output_dir, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+def latency_summary(values):
+    values = np.asarray(values) * 1000
+    if not len(values):
+        return {}
+    return {
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'max_ms': round(float(values.max()), 3),
+    }
+
+def replay(history, output_dir, speed=None, max_gap=None, indicators=True):
+    """
+    Rejoue l'historique dans la chaîne du collecteur (fichiers de points et barres
+    écrits dans `output_dir`). Entre deux instants, l'attente est l'écart d'origine
+    divisé par `speed`, plafonné à `max_gap` secondes d'historique (nuits, week-ends).
+    Retourne le rapport de débit et de latence par étape.
+
+    `output_dir` doit être vide : le collecteur ignore les points déjà enregistrés, un
+    rejeu dans le répertoire d'un rejeu précédent ne mesurerait aucune étape.
+    """
+    if os.path.isdir(output_dir) and os.listdir(output_dir):
+        raise FileExistsError(f"Le répertoire de rejeu '{output_dir}' n'est pas vide")
+    os.makedirs(output_dir, exist_ok=True)
+    engine = BarEngine(os.path.join(output_dir, 'bars'))
+    latencies = {stage: [] for stage in STAGES + ['cycle']}
+    lags = []
+    points = cycles = 0
+    last_indicators = None
+
+    started = time.perf_counter()
+    elapsed_history = 0.0
+    previous_time = None
+    for timestamp, data_points in iter_cycles(history):
+        if previous_time is not None:
+            gap = float(timestamp - previous_time)
+            elapsed_history += min(gap, max_gap) if max_gap is not None else gap
+        previous_time = timestamp
+        if speed:
+            delay = started + elapsed_history / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            lags.append(max(time.perf_counter() - (started + elapsed_history / speed), 0.0))
+
+        cycle_start = time.perf_counter()
+        # Mêmes étapes que main.ingest, chronométrées séparément
+        new_points = [data_point for data_point in data_points if save_data(data_point, output_dir)]
+        ingested = time.perf_counter()
+        if new_points:
+            engine.update(new_points)
+        aggregated = time.perf_counter()
+        if indicators and new_points:
+            last_indicators = compute_indicators(engine)
+        done = time.perf_counter()
+
+        latencies['ingest'].append(ingested - cycle_start)
+        latencies['bars'].append(aggregated - ingested)
+        latencies['indicators'].append(done - aggregated)
+        latencies['cycle'].append(done - cycle_start)
+        points += len(new_points)
+        cycles += 1
+
+    if not points:
+        raise ValueError(f"Aucun point ingéré sur {cycles} cycles : rien n'a été mesuré")
+    if last_indicators is not None:
+        save_analysis(last_indicators, os.path.join(output_dir, f'indicators_{INDICATOR_TIMEFRAME}.parquet'))
+    wall_time = time.perf_counter() - started
+    report = {
+        'points': points,
+        'cycles': cycles,
+        'wall_time_s': round(wall_time, 3),
+        'points_per_s': round(points / wall_time, 1) if wall_time > 0 else None,
+        'speed': speed or 'max',
+        'latency': {stage: latency_summary(values) for stage, values in latencies.items()},
+    }
+    if lags:
+        report['schedule_lag'] = latency_summary(lags)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue des séances enregistrées dans la chaîne du collecteur.")
+    parser.add_argument('--source', nargs='+', default=['real_time_data_*.json'],
+                        help="fichiers de points ou de barres à rejouer (glob)")
+    parser.add_argument('--output', default='replay', help="répertoire des fichiers écrits par le rejeu (vide)")
+    parser.add_argument('--overwrite', action='store_true', help="efface les fichiers d'un rejeu précédent dans --output")
+    parser.add_argument('--speed', default='max',
+                        help="facteur d'accélération (60 : une minute par seconde) ou 'max'")
+    parser.add_argument('--max-gap', type=float, default=3600,
+                        help="écart maximal rejoué entre deux instants, en secondes d'historique")
+    parser.add_argument('--tickers', nargs='+')
+    parser.add_argument('--no-indicators', action='store_true')
+    parser.add_argument('--report', help="écrit le rapport JSON dans ce fichier")
+    parser.add_argument('--verbose', action='store_true', help="journalise chaque point enregistré")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    speed = None if args.speed == 'max' else float(args.speed)
+    if speed is not None and speed <= 0:
+        parser.error("--speed doit être positif ou 'max'")
+    try:
+        history = load_history(args.source, args.tickers)
+        if args.overwrite:
+            clear_output(args.output)
+        report = replay(history, args.output, speed, args.max_gap, not args.no_indicators)
+    except Exception as e:
+        logging.error(f"Erreur lors du rejeu: {e}")
+        sys.exit(1)
+
+    print(json.dumps(report, indent=4))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as json_file:
+            json.dump(report, json_file, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,128 @@
+import os
+import re
 import sys
+import glob
+import json
+import time
+import logging
+import argparse
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+from market_client import fetch_all, get_ticker
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(message)s',
+    handlers=[
+        logging.FileHandler("etf_specifics.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+ETF_LIST = ['SPY', 'QQQ', 'EEM']
+ATTRIBUTES = ['expense_ratio', 'aum', 'inception_date', 'holdings_count']
+
+# Durée de validité d'un instantané : les données de référence changent rarement
+CACHE_TTL = 24 * 3600
+
+# Compositions enregistrées par sector_data (<ETF>_<AAAAMMJJ>.csv)
+HOLDINGS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'sector_data', 'holdings')
+
+def count_holdings(ticker, holdings_dir=HOLDINGS_DIR):
+    """
+    Nombre de lignes de la composition la plus récente de l'ETF, ou None si aucune.
+    """
+    snapshots = sorted(path for path in glob.glob(os.path.join(holdings_dir, f'{ticker}_*.csv'))
+                       if re.search(r'_\d{8}\.csv$', path))
+    if not snapshots:
+        return None
+    with open(snapshots[-1], 'r', encoding='utf-8') as file:
+        return sum(1 for line in file if line.strip()) - 1
+
+def fetch_reference_data(ticker):
+    """
+    Récupère les données de référence d'un ETF. Les attributs absents valent None.
+    """
+    info = get_ticker(ticker).info
+    if not info:
+        logging.warning(f"Aucune donnée de référence disponible pour {ticker}")
+        return None
+    expense_ratio = info.get('netExpenseRatio', info.get('annualReportExpenseRatio'))
+    inception = info.get('fundInceptionDate')
+    return {
+        'expense_ratio': float(expense_ratio) if expense_ratio is not None else None,
+        'aum': int(info['totalAssets']) if info.get('totalAssets') is not None else None,
+        'inception_date': datetime.fromtimestamp(inception, timezone.utc).strftime('%Y-%m-%d') if inception else None,
+        'holdings_count': count_holdings(ticker),
+    }
+
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error(f"Erreur de décodage JSON lors de la lecture du fichier {cache_file}: {e}")
+        return {}
+
+def diff_attributes(previous, current):
+    """
+    Attributs dont la valeur a changé. Un attribut devenu indisponible garde sa valeur.
+    """
+    return {attribute: current[attribute] for attribute in ATTRIBUTES
+            if current.get(attribute) is not None and current[attribute] != previous.get(attribute)}
+
+def update_etf_specifics(tickers=ETF_LIST, cache_file='etf_specifics_cache.json',
+                         table_file='etf_specifics.jsonl', ttl=CACHE_TTL):
+    """
+    Rafraîchit les instantanés expirés (en parallèle) et ajoute à la table une ligne
+    par attribut modifié : (ticker, date, attribute, value).
+    """
+    cache = load_cache(cache_file)
+    now = time.time()
+    expired = [ticker for ticker in tickers if now - cache.get(ticker, {}).get('fetched_at', 0) >= ttl]
+    if not expired:
+        logging.info("Instantanés encore valides : aucune donnée à récupérer.")
+        return
+
+    logging.info(f"Récupération des données de référence pour {', '.join(expired)}")
+    results = fetch_all(fetch_reference_data, expired)
+
+    date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    rows = []
+    for ticker in expired:
+        attributes = results[ticker]
+        if attributes is None:
+            continue
+        previous = cache.get(ticker, {}).get('attributes', {})
+        changes = diff_attributes(previous, attributes)
+        rows.extend({'ticker': ticker, 'date': date, 'attribute': attribute, 'value': value}
+                    for attribute, value in changes.items())
+        cache[ticker] = {'fetched_at': now, 'attributes': {**previous, **changes}}
+
+    try:
+        if rows:
+            with open(table_file, 'a', encoding='utf-8') as table:
+                for row in rows:
+                    table.write(json.dumps(row, ensure_ascii=False) + '\n')
+        with open(cache_file, 'w', encoding='utf-8') as json_file:
+            json.dump(cache, json_file, indent=4, ensure_ascii=False)
+        logging.info(f"{len(rows)} attributs modifiés enregistrés dans le fichier '{table_file}'.")
+    except Exception as e:
+        logging.error(f"Erreur lors de la sauvegarde des données: {e}")
 
 def main():
-    print("Testing implementation for table: etf_specifics")
-    # TODO: Implement data retrieval and processing for etf_specifics
+    parser = argparse.ArgumentParser(description="Met à jour la table etf_specifics (données de référence des ETFs).")
+    parser.add_argument('--tickers', nargs='+', default=ETF_LIST)
+    parser.add_argument('--cache', default='etf_specifics_cache.json')
+    parser.add_argument('--output', default='etf_specifics.jsonl')
+    parser.add_argument('--ttl', type=float, default=CACHE_TTL, help="validité d'un instantané, en secondes")
+    args = parser.parse_args()
+
+    logging.info("Mise à jour des données de référence des ETFs")
+    update_etf_specifics(args.tickers, args.cache, args.output, args.ttl)
 
 if __name__ == "__main__":
     main()
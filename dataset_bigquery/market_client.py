@@ -0,0 +1,47 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+from curl_cffi import requests as curl_requests
+
+# Client Yahoo Finance partagé par les collecteurs de dataset_bigquery : une session
+# (cookies et jeton Yahoo communs) et un pool de threads persistant. La session garde
+# une connexion par thread du pool, réutilisée d'un cycle de collecte à l'autre.
+MAX_WORKERS = 8
+
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = curl_requests.Session(impersonate='chrome')
+        return _session
+
+def get_ticker(symbol):
+    """
+    yf.Ticker adossé à la session partagée.
+    """
+    return yf.Ticker(symbol, session=get_session())
+
+def fetch_all(fetch, tickers, max_workers=MAX_WORKERS):
+    """
+    Appelle `fetch(ticker)` pour chaque ticker sur le pool partagé.
+    Retourne {ticker: résultat} ; un ticker en erreur a pour résultat None.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='market-client')
+    futures = {ticker: _executor.submit(fetch, ticker) for ticker in tickers}
+    results = {}
+    for ticker, future in futures.items():
+        try:
+            results[ticker] = future.result()
+        except Exception as e:
+            logging.error(f"Erreur inattendue lors de la récupération des données pour {ticker}: {e}")
+            results[ticker] = None
+    return results
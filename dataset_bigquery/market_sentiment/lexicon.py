@@ -0,0 +1,29 @@
+# Lexique financier hors ligne (sous-ensemble des listes de type Loughran-McDonald) :
+# les mots d'usage courant qui sont neutres en finance ("liability", "tax"...) en sont exclus.
+
+POSITIVE_WORDS = frozenset("""
+achieve achieved achievement advance advanced advances advantage attractive beat beats
+benefit benefited benefits best better boom boosted boosts breakthrough bullish confident
+delivered durable efficiency efficient encouraged encouraging enhance enhanced excellent
+exceeded exceeds expand expanded expansion favorable gain gained gaining gains good great
+greater growth highest improve improved improvement improves improving innovative jump
+jumped leading momentum optimistic outperform outperformed outperforming positive profitable
+profitability progress rallied rallies rally rebound rebounded record recovered recovery
+resilient rise rises rising robust soar soared soaring solid stable strength strengthen
+strengthened strong stronger strongest succeed success successful surge surged surpassed
+tailwind tailwinds upbeat upgrade upgraded upside upturn win winning
+""".split())
+
+NEGATIVE_WORDS = frozenset("""
+adverse bankrupt bankruptcy bearish breach challenging closure collapse collapsed
+concern concerns crisis critical cut cuts decline declined declines declining default
+defaulted deficit delay delayed deteriorate deteriorated deterioration difficult difficulties
+disappointing disappointed downgrade downgraded downside downturn drop dropped drops
+failed failure fall falling falls fear fears fell fraud headwind headwinds hurt impairment
+inflationary investigation lawsuit layoffs litigation lose loses losing loss losses
+lower lowest miss missed misses negative plunge plunged plunges poor recession restructuring
+risk risks risky selloff shortfall shrink slowdown slump slumped slowing sluggish stress
+subpoena tumble tumbled turmoil uncertain uncertainty underperform underperformed unfavorable
+volatile volatility warn warned warning weak weaken weakened weaker weakness worse worst
+writedown
+""".split())
@@ -1,8 +1,209 @@
+import os
 import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pytz import timezone, utc
+from sklearn.feature_extraction.text import CountVectorizer
+
+from lexicon import NEGATIVE_WORDS, POSITIVE_WORDS
+
+# Reconnaissance des tickers partagée avec le scraper, importée par son chemin
+# complet depuis la racine du dépôt (placée en dernier dans sys.path)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..'))
+from scraping_project.src.scraper.article_index import extract_tickers
+from scraping_project.src.scraper.seen_index import canonical_url
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(message)s',
+    handlers=[
+        logging.FileHandler("market_sentiment.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+MARKET_TIMEZONE = timezone('America/New_York')
+BATCH_SIZE = 2048
+
+def content_hash(text):
+    """
+    Empreinte SHA-256 du contenu d'un article (la même clé que le stockage du scraper).
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def market_date(utc_time):
+    """
+    Jour (heure du marché) d'un horodatage UTC 'AAAA-MM-JJ HH:MM:SS'.
+    """
+    return utc.localize(datetime.strptime(utc_time, '%Y-%m-%d %H:%M:%S')).astimezone(MARKET_TIMEZONE).strftime('%Y-%m-%d')
+
+def load_seen_dates(index_file):
+    """
+    Jour de récupération de chaque URL d'après l'index des URLs vues du scraper.
+    """
+    try:
+        with open(index_file, 'r', encoding='utf-8') as json_file:
+            entries = json.load(json_file)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error(f"Erreur de décodage JSON lors de la lecture du fichier {index_file}: {e}")
+        return {}
+    return {url: market_date(entry['fetched_at']) for url, entry in entries.items() if entry.get('fetched_at')}
+
+def load_articles(source, index_file=None):
+    """
+    Charge les articles du scraper : fichier JSON (articles_with_content.json) ou
+    répertoire d'un ArticleStore. Chaque article est daté du jour où il a été
+    récupéré, à l'heure du marché : date d'enregistrement dans le stockage, ou date
+    de récupération de son URL dans l'index du scraper (`index_file`) pour un
+    fichier JSON. Les articles sans date sont écartés.
+    """
+    if os.path.isdir(source):
+        from scraping_project.src.scraper.article_store import ArticleStore
+        store = ArticleStore(source)
+        articles = []
+        for article, stored_at in store.records():
+            article['date'] = market_date(stored_at)
+            articles.append(article)
+        store.close()
+        return articles
+    try:
+        with open(source, 'r', encoding='utf-8') as json_file:
+            articles = json.load(json_file)
+    except FileNotFoundError:
+        logging.error(f"Fichier d'articles introuvable: {source}")
+        return []
+
+    seen_dates = load_seen_dates(index_file) if index_file else {}
+    dated = []
+    for article in articles:
+        article_date = article.get('date') or seen_dates.get(canonical_url(article['url']))
+        if article_date:
+            dated.append({**article, 'date': article_date})
+    if len(dated) < len(articles):
+        logging.warning(f"{len(articles) - len(dated)} articles sans date de récupération ignorés.")
+    return dated
+
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error(f"Erreur de décodage JSON lors de la lecture du fichier {cache_file}: {e}")
+        return {}
+
+def build_scorer():
+    """
+    Vectoriseur restreint au lexique et poids des mots (+1 positif, -1 négatif).
+    """
+    vocabulary = sorted(POSITIVE_WORDS | NEGATIVE_WORDS)
+    vectorizer = CountVectorizer(vocabulary=vocabulary, lowercase=True, dtype=np.int32)
+    positive = np.array([word in POSITIVE_WORDS for word in vocabulary], dtype=np.int32)
+    return vectorizer, positive, 1 - positive
+
+def score_texts(scorer, texts):
+    """
+    Score un lot de textes en une passe : matrice creuse (textes x mots du lexique)
+    multipliée par les masques positif / négatif.
+    Retourne (score dans [-1, 1], mots positifs, mots négatifs).
+    """
+    vectorizer, positive_mask, negative_mask = scorer
+    counts = vectorizer.transform(texts)
+    positive = counts @ positive_mask
+    negative = counts @ negative_mask
+    total = positive + negative
+    score = np.divide(positive - negative, total, out=np.zeros(len(texts)), where=total > 0)
+    return score, positive, negative
+
+def score_new_articles(articles, cache, batch_size=BATCH_SIZE):
+    """
+    Score les articles absents du cache (clé : empreinte du contenu), par lots.
+    Un article repris sous plusieurs URLs n'est scoré qu'une fois.
+    """
+    pending = {}
+    for article in articles:
+        digest = content_hash(article['contenu'])
+        if digest not in cache and digest not in pending:
+            pending[digest] = article
+    if not pending:
+        return 0
+
+    scorer = build_scorer()
+    digests = list(pending)
+    for start in range(0, len(digests), batch_size):
+        batch = [pending[digest] for digest in digests[start:start + batch_size]]
+        texts = [f"{article['titre']}\n{article['contenu']}" for article in batch]
+        scores, positive, negative = score_texts(scorer, texts)
+        for digest, article, text, score, pos, neg in zip(digests[start:start + batch_size], batch, texts,
+                                                          scores, positive, negative):
+            cache[digest] = {
+                'date': article['date'],
+                'tickers': extract_tickers(text),
+                'score': round(float(score), 4),
+                'positive': int(pos),
+                'negative': int(neg),
+            }
+    return len(pending)
+
+def aggregate_sentiment(cache):
+    """
+    Table market_sentiment : sentiment moyen par ticker et par jour.
+    """
+    columns = ['ticker', 'date', 'sentiment', 'positive_words', 'negative_words', 'article_count']
+    scores = pd.DataFrame.from_records(list(cache.values()))
+    if scores.empty:
+        return pd.DataFrame(columns=columns)
+    scores = scores.explode('tickers').dropna(subset=['tickers']).rename(columns={'tickers': 'ticker'})
+    table = scores.groupby(['ticker', 'date'], sort=True).agg(
+        sentiment=('score', 'mean'),
+        positive_words=('positive', 'sum'),
+        negative_words=('negative', 'sum'),
+        article_count=('score', 'size'),
+    ).reset_index()
+    table['sentiment'] = table['sentiment'].round(4)
+    return table[columns]
 
 def main():
-    print("Testing implementation for table: market_sentiment")
-    # TODO: Implement data retrieval and processing for market_sentiment
+    parser = argparse.ArgumentParser(description="Construit la table market_sentiment à partir des articles scrapés.")
+    parser.add_argument('--articles', default='articles_with_content.json',
+                        help="fichier JSON du scraper ou répertoire du stockage d'articles")
+    parser.add_argument('--seen-index', default='seen_urls.json',
+                        help="index des URLs vues du scraper, qui date les articles d'un fichier JSON")
+    parser.add_argument('--cache', default='sentiment_cache.json')
+    parser.add_argument('--output', default='market_sentiment.json')
+    args = parser.parse_args()
+
+    logging.info("Calcul du sentiment de marché")
+    cache = load_cache(args.cache)
+    articles = load_articles(args.articles, args.seen_index)
+
+    started = time.perf_counter()
+    scored = score_new_articles(articles, cache)
+    elapsed = time.perf_counter() - started
+    if scored:
+        logging.info(f"{scored} nouveaux articles scorés en {elapsed:.2f} s ({scored / elapsed:.0f} articles/s)")
+    else:
+        logging.info("Aucun nouvel article à scorer.")
+
+    try:
+        with open(args.cache, 'w', encoding='utf-8') as json_file:
+            json.dump(cache, json_file, ensure_ascii=False)
+        table = aggregate_sentiment(cache)
+        with open(args.output, 'w', encoding='utf-8') as json_file:
+            json.dump(table.to_dict(orient='records'), json_file, indent=4, ensure_ascii=False)
+        logging.info(f"{len(table)} lignes enregistrées dans le fichier '{args.output}'.")
+    except Exception as e:
+        logging.error(f"Erreur lors de la sauvegarde de la table market_sentiment: {e}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,234 @@
+import os
+import sys
+import glob
+import logging
+import argparse
+
+import duckdb
+import pyarrow.dataset as pa_dataset
+
+from schema import CATEGORY, EPOCH, FLOAT32, INT64, MARKET_TIMEZONE, get_schema
+from table_io import EXTENSIONS, FEATHER, JSON, NDJSON, PARQUET, detect_format, split_compression
+
+# Couche de requêtes SQL (DuckDB) sur les tables du dataset : chaque table est une
+# vue sur ses fichiers (JSON, NDJSON, Parquet, Feather), lus au moment de la requête.
+# Les vues exposent les mêmes colonnes quel que soit le format : ticker, date (DATE),
+# datetime (TIMESTAMP, heure du marché) et les valeurs de la table.
+DATASET_DIR = os.path.dirname(os.path.realpath(__file__))
+
+INDICATORS = ['moving_averages', 'rsi', 'bollinger_bands', 'macd', 'stochastic', 'adx']
+
+# Vue -> (schéma de la table ou None, motifs des fichiers relatifs au répertoire du dataset)
+VIEWS = {
+    'economic_data': ('economic_data', ['economic_data/economic_data.*']),
+    'etf_market_data': ('etf_market_data', ['etf_market_data/real_time_data_*.*']),
+    'etf_market_bars': ('etf_market_bars', ['etf_market_data/bars/timeframe=*/date=*/bars.parquet']),
+    **{indicator: ('technical_indicators', [f'technical_indicators/{indicator}_analysis.*',
+                                            f'technical_indicators/results/{indicator}.*'])
+       for indicator in INDICATORS},
+    'market_sentiment': (None, ['market_sentiment/market_sentiment.*']),
+    'sector_weights': (None, ['sector_data/sector_weights.*']),
+    'sector_returns': (None, ['sector_data/sector_returns.*']),
+    'etf_specifics': (None, ['etf_specifics/etf_specifics.*']),
+}
+
+SQL_TYPES = {
+    CATEGORY: 'VARCHAR',
+    EPOCH: 'BIGINT',
+    FLOAT32: 'FLOAT',
+    INT64: 'BIGINT',
+}
+
+# Tickers survendus (RSI) avec un pic de volume sur les derniers jours de cotation
+OVERSOLD_VOLUME_SPIKES = """
+WITH sessions AS (
+    SELECT date, DENSE_RANK() OVER (ORDER BY date DESC) AS session
+    FROM (SELECT DISTINCT date FROM economic_data)
+),
+prices AS (
+    SELECT ticker, date, close_price, volume,
+           volume / AVG(volume) OVER (
+               PARTITION BY ticker ORDER BY date ROWS BETWEEN 20 PRECEDING AND 1 PRECEDING
+           ) AS volume_ratio
+    FROM economic_data
+)
+SELECT p.ticker, p.date, r.RSI, p.close_price, p.volume, round(p.volume_ratio, 2) AS volume_ratio
+FROM prices p
+JOIN rsi r USING (ticker, date)
+JOIN sessions s USING (date)
+WHERE r.RSI < $rsi
+  AND p.volume_ratio >= $volume_ratio
+  AND s.session <= $days
+ORDER BY p.date DESC, p.ticker
+"""
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def sql_string(value):
+    return "'" + value.replace("'", "''") + "'"
+
+def sql_list(values):
+    return '[' + ', '.join(sql_string(value) for value in values) + ']'
+
+def find_files(patterns, base_dir=DATASET_DIR):
+    """
+    Fichiers de table correspondant aux motifs (extensions reconnues uniquement).
+    """
+    paths = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(base_dir, pattern)):
+            extension = os.path.splitext(split_compression(path)[0])[1].lower()
+            if extension in EXTENSIONS and os.path.getsize(path) > 0:
+                paths.add(path)
+    return sorted(paths)
+
+def json_source(con, paths, table):
+    """
+    read_json avec des types explicites : ceux du schéma pour ses colonnes, DATE /
+    TIMESTAMP pour date / datetime, le type détecté pour les autres.
+    """
+    files = sql_list(paths)
+    detected = con.execute(f"DESCRIBE SELECT * FROM read_json({files}, format='auto')").fetchall()
+    schema = get_schema(table) if table else {}
+    columns = {}
+    for name, detected_type, *_ in detected:
+        if name in schema:
+            columns[name] = SQL_TYPES[schema[name]]
+        elif name == 'date':
+            columns[name] = 'DATE'
+        elif name == 'datetime':
+            columns[name] = 'TIMESTAMP'
+        else:
+            columns[name] = detected_type
+    struct = '{' + ', '.join(f"{sql_string(name)}: {sql_string(sql_type)}" for name, sql_type in columns.items()) + '}'
+    return f"read_json({files}, format='auto', columns={struct})", list(columns)
+
+def source_columns(con, source):
+    return [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+
+def select_list(columns):
+    """
+    Colonnes de la vue : un horodatage epoch (fichiers typés) redevient date / datetime.
+    """
+    expressions = []
+    for column in columns:
+        if column == 'timestamp':
+            local = f"timezone({sql_string(MARKET_TIMEZONE)}, to_timestamp({quote(column)}))"
+            expressions += [f"CAST({local} AS DATE) AS date", f"CAST({local} AS TIMESTAMP) AS datetime"]
+        else:
+            expressions.append(quote(column))
+    return ', '.join(expressions)
+
+def register_view(con, name, paths, table=None):
+    """
+    Crée la vue `name` sur les fichiers `paths`, regroupés par format.
+    """
+    groups = {}
+    for path in paths:
+        groups.setdefault(detect_format(path), []).append(path)
+    selects = []
+    for file_format, files in sorted(groups.items()):
+        if file_format in (JSON, NDJSON):
+            source, columns = json_source(con, files, table)
+        elif file_format == PARQUET:
+            source = f"read_parquet({sql_list(files)}, union_by_name = true)"
+            columns = source_columns(con, source)
+        elif file_format == FEATHER:
+            # Pas de lecteur Arrow IPC dans DuckDB : jeu de données pyarrow, parcouru à la demande
+            source = quote(f'_{name}_feather')
+            con.register(f'_{name}_feather', pa_dataset.dataset(files, format='feather'))
+            columns = source_columns(con, source)
+        selects.append(f"SELECT {select_list(columns)} FROM {source}")
+    con.execute(f"CREATE OR REPLACE VIEW {quote(name)} AS {' UNION ALL BY NAME '.join(selects)}")
+
+def register_bucket(con, bucket_dir):
+    """
+    Vues staged_<table> sur les fichiers Parquet de staging (voir staging.py).
+    """
+    views = []
+    for table_dir in sorted(glob.glob(os.path.join(bucket_dir, '*', ''))):
+        table = os.path.basename(os.path.dirname(table_dir))
+        if not glob.glob(os.path.join(table_dir, '*', '*.parquet')):
+            continue
+        pattern = sql_string(os.path.join(table_dir, '*', '*.parquet'))
+        con.execute(f"CREATE OR REPLACE VIEW {quote('staged_' + table)} AS "
+                    f"SELECT * FROM read_parquet({pattern}, hive_partitioning = true)")
+        views.append('staged_' + table)
+    return views
+
+def connect(base_dir=DATASET_DIR, bucket_dir=None, database=':memory:'):
+    """
+    Connexion DuckDB avec une vue par table du dataset présente sur disque
+    (et par table de staging si `bucket_dir` est donné).
+    """
+    con = duckdb.connect(database)
+    for name, (table, patterns) in VIEWS.items():
+        paths = find_files(patterns, base_dir)
+        if not paths:
+            logging.debug(f"Vue {name} ignorée : aucun fichier")
+            continue
+        try:
+            register_view(con, name, paths, table)
+        except duckdb.Error as e:
+            logging.error(f"Erreur lors de l'enregistrement de la vue {name}: {e}")
+    if bucket_dir:
+        register_bucket(con, bucket_dir)
+    return con
+
+def list_views(con):
+    return [row[0] for row in con.execute(
+        "SELECT view_name FROM duckdb_views() WHERE NOT internal ORDER BY view_name").fetchall()
+        if not row[0].startswith('_')]
+
+def query(con, sql, params=None):
+    """
+    Exécute une requête et retourne le résultat en DataFrame.
+    """
+    return con.execute(sql, params or {}).df()
+
+def oversold_volume_spikes(con, days=5, rsi=30, volume_ratio=2.0):
+    """
+    Séances des `days` derniers jours de cotation où le RSI est sous `rsi` et le volume dépasse
+    `volume_ratio` fois sa moyenne des 20 séances précédentes.
+    """
+    return query(con, OVERSOLD_VOLUME_SPIKES, {'days': days, 'rsi': rsi, 'volume_ratio': volume_ratio})
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Requêtes SQL (DuckDB) sur les tables du dataset.")
+    parser.add_argument('sql', nargs='?', help="requête SQL sur les vues (voir --tables)")
+    parser.add_argument('--data-dir', default=DATASET_DIR, help="répertoire du dataset")
+    parser.add_argument('--bucket', help="répertoire de staging : vues staged_<table>")
+    parser.add_argument('--tables', action='store_true', help="liste les vues disponibles")
+    parser.add_argument('--oversold', action='store_true', help="RSI bas et pic de volume sur les derniers jours")
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--rsi', type=float, default=30)
+    parser.add_argument('--volume-ratio', type=float, default=2.0)
+    parser.add_argument('--csv', help="écrit le résultat dans ce fichier CSV")
+    args = parser.parse_args()
+
+    con = connect(args.data_dir, args.bucket)
+    if args.tables:
+        for view in list_views(con):
+            print(view)
+        return
+    try:
+        if args.oversold:
+            result = oversold_volume_spikes(con, args.days, args.rsi, args.volume_ratio)
+        elif args.sql:
+            result = query(con, args.sql)
+        else:
+            parser.error("une requête SQL, --oversold ou --tables est nécessaire")
+    except duckdb.Error as e:
+        logging.error(f"Erreur lors de l'exécution de la requête: {e}")
+        sys.exit(1)
+
+    if args.csv:
+        result.to_csv(args.csv, index=False)
+        logging.info(f"{len(result)} lignes enregistrées dans le fichier '{args.csv}'.")
+    else:
+        print(result.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Schéma typé des tables de dataset_bigquery, déclaré une seule fois par table et
+# utilisé par les chargeurs et les écrivains :
+#   - ticker : catégorie (un code par ligne au lieu d'une chaîne répétée)
+#   - timestamp : entier int64, secondes depuis l'epoch (UTC) ; remplace les
+#     colonnes date / datetime, reconstruites à l'écriture à l'heure du marché
+#   - prix et indicateurs : float32 quand la perte de précision reste sous
+#     FLOAT32_TOLERANCE, sinon float64
+#   - volumes : int64
+MARKET_TIMEZONE = 'America/New_York'
+TIME_COLUMNS = ('date', 'datetime')
+DATE_FORMAT = '%Y-%m-%d'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Écart maximal accepté entre une valeur et sa conversion en float32 (un centième de cent)
+FLOAT32_TOLERANCE = 1e-4
+
+CATEGORY = 'category'
+EPOCH = 'epoch'
+FLOAT32 = 'float32'
+INT64 = 'int64'
+
+PRICE_SCHEMA = {
+    'ticker': CATEGORY,
+    'timestamp': EPOCH,
+    'open_price': FLOAT32,
+    'close_price': FLOAT32,
+    'high_price': FLOAT32,
+    'low_price': FLOAT32,
+    'volume': INT64,
+}
+
+# Barres OHLCV agrégées à partir des points minute (etf_market_data/bars.py)
+BAR_SCHEMA = {
+    'ticker': CATEGORY,
+    'timeframe': CATEGORY,
+    **{column: kind for column, kind in PRICE_SCHEMA.items() if column != 'ticker'},
+    'tick_count': INT64,
+}
+
+INDICATOR_SCHEMA = {
+    'ticker': CATEGORY,
+    'timestamp': EPOCH,
+    'SMA': FLOAT32,
+    'EMA': FLOAT32,
+    'RSI': FLOAT32,
+    'Upper_Band': FLOAT32,
+    'Lower_Band': FLOAT32,
+    'MACD': FLOAT32,
+    'Signal_Line': FLOAT32,
+    '%K': FLOAT32,
+    '%D': FLOAT32,
+    'ADX': FLOAT32,
+}
+
+SCHEMAS = {
+    'economic_data': PRICE_SCHEMA,
+    'etf_market_data': PRICE_SCHEMA,
+    'etf_market_bars': BAR_SCHEMA,
+    'technical_indicators': INDICATOR_SCHEMA,
+}
+
+# Colonnes des historiques yfinance (Ticker.history) vers les colonnes des tables
+HISTORY_COLUMNS = {
+    'Open': 'open_price',
+    'Close': 'close_price',
+    'High': 'high_price',
+    'Low': 'low_price',
+    'Volume': 'volume',
+}
+
+# Types BigQuery des colonnes (fichiers de schéma des tables chargées)
+BIGQUERY_TYPES = {
+    CATEGORY: 'STRING',
+    EPOCH: 'TIMESTAMP',
+    FLOAT32: 'FLOAT',
+    INT64: 'INTEGER',
+}
+
+# Types pandas à la lecture des fichiers JSON, avant application du schéma
+# (volumes lus en float64 : une valeur manquante y devient NaN, puis 0)
+READ_DTYPES = {
+    CATEGORY: 'str',
+    EPOCH: 'int64',
+    FLOAT32: 'float64',
+    INT64: 'float64',
+}
+
+def get_schema(table):
+    try:
+        return SCHEMAS[table]
+    except KeyError:
+        raise ValueError(f"Table inconnue: {table}") from None
+
+def read_dtypes(table):
+    """
+    Types explicites des colonnes d'un fichier JSON de la table (date / datetime comprises).
+    """
+    dtypes = {column: READ_DTYPES[kind] for column, kind in get_schema(table).items()}
+    dtypes.update({column: 'str' for column in TIME_COLUMNS})
+    return dtypes
+
+def bigquery_schema(table, columns=None):
+    """
+    Schéma BigQuery (format JSON de `bq load --schema`) de la table, restreint à
+    `columns` si donné. Le ticker et l'horodatage sont obligatoires.
+    """
+    return [
+        {'name': column, 'type': BIGQUERY_TYPES[kind],
+         'mode': 'REQUIRED' if kind in (CATEGORY, EPOCH) else 'NULLABLE'}
+        for column, kind in get_schema(table).items()
+        if columns is None or column in columns
+    ]
+
+def to_epoch(values):
+    """
+    Dates (chaînes ou datetime) vers secondes epoch int64. Les dates sans fuseau
+    sont à l'heure du marché.
+    """
+    times = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        try:
+            times = pd.to_datetime(times, format=DATETIME_FORMAT)
+        except ValueError:
+            times = pd.to_datetime(times, format='mixed')
+    if times.dt.tz is None:
+        times = times.dt.tz_localize(MARKET_TIMEZONE, ambiguous=False, nonexistent='shift_forward')
+    return times.dt.tz_convert('UTC').astype('datetime64[s, UTC]').astype(np.int64).to_numpy()
+
+def from_epoch(values):
+    """
+    Secondes epoch vers des dates à l'heure du marché.
+    """
+    return pd.to_datetime(pd.Series(values, dtype=np.int64), unit='s', utc=True).dt.tz_convert(MARKET_TIMEZONE)
+
+def downcast_float(values, tolerance=FLOAT32_TOLERANCE):
+    """
+    float32 si aucune valeur ne s'écarte de plus de `tolerance`, sinon float64.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    narrow = values.astype(np.float32)
+    finite = np.isfinite(values)
+    if finite.any() and np.abs(values[finite] - narrow[finite]).max() > tolerance:
+        return values
+    return narrow
+
+def apply_schema(data, table):
+    """
+    Convertit un DataFrame au schéma de `table`. Les colonnes date / datetime sont
+    remplacées par `timestamp` ; les colonnes hors schéma sont conservées telles quelles.
+    """
+    schema = get_schema(table)
+    data = data.copy()
+    if 'timestamp' in schema and 'timestamp' not in data.columns:
+        source = next((column for column in reversed(TIME_COLUMNS) if column in data.columns), None)
+        if source is not None:
+            data['timestamp'] = to_epoch(data[source].to_numpy())
+    data = data.drop(columns=[column for column in TIME_COLUMNS if column in data.columns])
+
+    for column, kind in schema.items():
+        if column not in data.columns:
+            continue
+        if kind == CATEGORY:
+            data[column] = data[column].astype('category')
+        elif kind == EPOCH:
+            data[column] = data[column].astype(np.int64)
+        elif kind == FLOAT32:
+            data[column] = downcast_float(data[column])
+        elif kind == INT64:
+            data[column] = pd.to_numeric(data[column]).fillna(0).astype(np.int64)
+    ordered = [column for column in schema if column in data.columns]
+    return data[ordered + [column for column in data.columns if column not in schema]]
+
+def from_history(history, ticker, table):
+    """
+    Table typée à partir d'un historique yfinance (index Date ou Datetime).
+    """
+    data = history[list(HISTORY_COLUMNS)].rename(columns=HISTORY_COLUMNS)
+    data.insert(0, 'datetime', history.index)
+    data.insert(0, 'ticker', ticker)
+    return apply_schema(data.reset_index(drop=True), table)
+
+def json_frame(data):
+    """
+    Colonnes JSON d'une table typée : `timestamp` redevient date / datetime (heure
+    du marché) et les float32 retrouvent leur écriture décimale la plus courte.
+    """
+    data = data.copy()
+    if 'timestamp' in data.columns:
+        # Chaque instant n'est formaté qu'une fois (les tickers partagent les mêmes dates)
+        codes, instants = pd.factorize(data['timestamp'].to_numpy())
+        times = from_epoch(instants)
+        position = data.columns.get_loc('timestamp')
+        data.insert(position, 'datetime', times.dt.strftime(DATETIME_FORMAT).to_numpy()[codes])
+        data.insert(position, 'date', times.dt.strftime(DATE_FORMAT).to_numpy()[codes])
+        data = data.drop(columns='timestamp')
+    for column in data.columns:
+        if isinstance(data[column].dtype, pd.CategoricalDtype):
+            data[column] = data[column].astype(object)
+        elif data[column].dtype == np.float32:
+            # repr float32 ('487.64') plutôt que son expansion float64 ('487.6400146484375')
+            data[column] = data[column].to_numpy().astype(str).astype(np.float64)
+    return data
+
+def to_records(data):
+    """
+    Enregistrements JSON (liste de dicts) d'une table typée.
+    """
+    return json_frame(data).to_dict(orient='records')
+
+def memory_footprint(data):
+    """
+    Taille en mémoire d'un DataFrame, en octets (chaînes comprises).
+    """
+    return int(data.memory_usage(deep=True).sum())
+
+def log_footprint(data, table):
+    logging.info(f"Table {table}: {len(data)} lignes, {memory_footprint(data) / 1024 ** 2:.2f} Mo en mémoire")
@@ -1,8 +1,262 @@
+import os
+import re
 import sys
+import glob
+import json
+import time
+import hashlib
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(message)s',
+    handlers=[
+        logging.FileHandler("sector_data.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+# Composition d'un ETF à une date : holdings/<ETF>_<AAAAMMJJ>.csv (colonnes symbol, weight, sector)
+HOLDINGS_PATTERN = re.compile(r'^(?P<etf>[A-Z0-9.\-]+)_(?P<date>\d{8})\.csv$')
+
+WEIGHT_COLUMNS = ['etf', 'date', 'sector', 'weight', 'holdings_count']
+RETURN_COLUMNS = ['etf', 'date', 'sector', 'sector_return', 'contribution']
+
+def file_hash(path):
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def scan_holdings(holdings_dir):
+    """
+    Liste les fichiers de composition : DataFrame (etf, date, path, hash), trié.
+    """
+    rows = []
+    for path in glob.glob(os.path.join(holdings_dir, '*.csv')):
+        match = HOLDINGS_PATTERN.match(os.path.basename(path))
+        if match is None:
+            logging.warning(f"Fichier de composition ignoré (nom inattendu): {path}")
+            continue
+        rows.append((match['etf'], pd.Timestamp(match['date']), path, file_hash(path)))
+    snapshots = pd.DataFrame(rows, columns=['etf', 'date', 'path', 'hash'])
+    return snapshots.sort_values(['etf', 'date'], ignore_index=True)
+
+def load_holdings(snapshots):
+    """
+    Charge les compositions listées dans `snapshots` en une seule table
+    (etf, date, symbol, weight, sector), poids normalisés à 1 par composition.
+    """
+    frames = []
+    for snapshot in snapshots.itertuples(index=False):
+        holdings = pd.read_csv(snapshot.path, usecols=['symbol', 'weight', 'sector'],
+                               dtype={'symbol': str, 'weight': np.float64, 'sector': str})
+        frames.append(holdings.assign(etf=snapshot.etf, date=snapshot.date))
+    if not frames:
+        return pd.DataFrame(columns=['etf', 'date', 'symbol', 'weight', 'sector'])
+    holdings = pd.concat(frames, ignore_index=True)
+    holdings['sector'] = holdings['sector'].fillna('Unknown')
+    holdings['weight'] = holdings['weight'] / holdings.groupby(['etf', 'date'])['weight'].transform('sum')
+    return holdings
+
+def load_returns(prices_file):
+    """
+    Rendements journaliers des constituants (dates x symboles), à partir d'un fichier
+    de cours au format des autres tables : ticker, date, close_price (JSON ou CSV).
+    """
+    if prices_file.endswith('.json'):
+        prices = pd.read_json(prices_file, convert_dates=['date'])
+    else:
+        prices = pd.read_csv(prices_file, usecols=['ticker', 'date', 'close_price'], parse_dates=['date'])
+    closes = prices.pivot_table(index='date', columns='ticker', values='close_price', aggfunc='last').sort_index()
+    return closes.pct_change(fill_method=None).iloc[1:]
+
+def sector_weights(holdings):
+    """
+    Poids de chaque secteur par ETF et par date de composition.
+    """
+    return holdings.groupby(['etf', 'date', 'sector'], sort=True).agg(
+        weight=('weight', 'sum'),
+        holdings_count=('symbol', 'size'),
+    ).reset_index()[WEIGHT_COLUMNS]
+
+def sector_returns(holdings, periods, returns):
+    """
+    Rendement quotidien de chaque secteur de chaque ETF, pour chaque composition sur
+    sa période [début, fin) décrite par `periods` (etf, date, start, end).
+
+    Les poids forment une matrice creuse (etf, composition, secteur) x symboles.
+    Chaque composition est multipliée par les seuls rendements de sa période : la
+    mémoire utilisée suit le nombre de lignes produites, pas dates x groupes.
+    """
+    if holdings.empty or returns.empty:
+        return pd.DataFrame(columns=RETURN_COLUMNS)
+    symbols = pd.Index(returns.columns)
+    holdings = holdings.assign(symbol_code=symbols.get_indexer(holdings['symbol']))
+    missing = holdings['symbol_code'] < 0
+    if missing.any():
+        logging.warning(f"{holdings.loc[missing, 'symbol'].nunique()} constituants sans cours ignorés.")
+        holdings = holdings[~missing]
+
+    group_codes, groups = pd.MultiIndex.from_frame(holdings[['etf', 'date', 'sector']]).factorize()
+    weights = sparse.csr_matrix(
+        (holdings['weight'].to_numpy(), (group_codes, holdings['symbol_code'].to_numpy())),
+        shape=(len(groups), len(symbols))
+    )
+    # Les constituants sans rendement ce jour-là ne contribuent pas
+    daily = returns.to_numpy(dtype=np.float64)
+    covered = np.isfinite(daily)
+    filled = np.where(covered, daily, 0.0)
+    covered = covered.astype(np.float64)
+
+    # Dates de chaque composition : celles de sa période
+    groups = groups.to_frame(index=False, name=['etf', 'date', 'sector']).merge(periods, on=['etf', 'date'], how='left')
+    dates = returns.index.to_numpy()
+    first = np.searchsorted(dates, groups['start'].to_numpy())
+    last = np.searchsorted(dates, groups['end'].to_numpy())
+
+    group_parts, day_parts, contribution_parts, weight_parts = [], [], [], []
+    for rows in groups.groupby(['etf', 'date'], sort=False).indices.values():
+        start, end = first[rows[0]], last[rows[0]]
+        if end <= start:
+            continue
+        composition = weights[rows]
+        # (jours de la période) x (secteurs de la composition)
+        contribution_parts.append(composition.dot(filled[start:end].T).T.ravel())
+        weight_parts.append(composition.dot(covered[start:end].T).T.ravel())
+        group_parts.append(np.tile(rows, end - start))
+        day_parts.append(np.repeat(np.arange(start, end), len(rows)))
+    if not group_parts:
+        return pd.DataFrame(columns=RETURN_COLUMNS)
+
+    group_index, day_index = np.concatenate(group_parts), np.concatenate(day_parts)
+    contribution, weight = np.concatenate(contribution_parts), np.concatenate(weight_parts)
+    table = pd.DataFrame({
+        'etf': groups['etf'].to_numpy()[group_index],
+        'date': dates[day_index],
+        'sector': groups['sector'].to_numpy()[group_index],
+        'sector_return': np.divide(contribution, weight, out=np.full(len(weight), np.nan), where=weight > 0),
+        'contribution': contribution,
+    })
+    return table.sort_values(['etf', 'date', 'sector'], ignore_index=True)
+
+def load_state(state_file):
+    try:
+        with open(state_file, 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+    except FileNotFoundError:
+        return {'holdings': {}, 'last_price_date': None}
+
+def load_table(path, columns):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    return pd.read_parquet(path)
+
+def replace_rows(table, stale, new_rows):
+    """
+    Remplace les lignes périmées d'une table par les lignes recalculées.
+    """
+    kept = table[~stale]
+    if kept.empty:
+        return new_rows.reset_index(drop=True)
+    return pd.concat([kept, new_rows], ignore_index=True)
+
+def recompute_start(snapshots, state, last_price_date):
+    """
+    Date à partir de laquelle recalculer chaque ETF : la plus ancienne composition
+    ajoutée, modifiée ou supprimée ; sinon le lendemain des derniers cours traités
+    si de nouveaux cours sont arrivés. Les ETFs absents sont à jour.
+    """
+    previous = pd.DataFrame(
+        [(etf, pd.Timestamp(date), digest) for key, digest in state['holdings'].items()
+         for etf, date in [key.split('|')]],
+        columns=['etf', 'date', 'previous_hash']
+    )
+    merged = snapshots[['etf', 'date', 'hash']].merge(previous, on=['etf', 'date'], how='outer')
+    changed = merged[merged['hash'] != merged['previous_hash']]
+    start = changed.groupby('etf')['date'].min()
+
+    if state['last_price_date'] and last_price_date > pd.Timestamp(state['last_price_date']):
+        new_prices = pd.Timestamp(state['last_price_date']) + pd.Timedelta(days=1)
+        others = pd.Series(new_prices, index=snapshots['etf'].unique().astype(object))
+        start = start.combine(others, min, fill_value=pd.Timestamp.max)
+    elif not state['last_price_date']:
+        start = pd.Series(pd.Timestamp.min, index=snapshots['etf'].unique().astype(object))
+    return start, changed
+
+def build_sector_data(holdings_dir, prices_file, weights_file='sector_weights.parquet',
+                      returns_file='sector_returns.parquet', state_file='sector_state.json'):
+    """
+    Met à jour les tables sector_weights et sector_returns : seules les compositions
+    nouvelles ou modifiées, et les nouvelles dates de cours, sont recalculées.
+    """
+    started = time.perf_counter()
+    state = load_state(state_file)
+    snapshots = scan_holdings(holdings_dir)
+    returns = load_returns(prices_file)
+    last_price_date = returns.index.max()
+
+    start, changed = recompute_start(snapshots, state, last_price_date)
+    if start.empty:
+        logging.info("Compositions et cours inchangés : rien à recalculer.")
+        return
+
+    # Période de chaque composition : jusqu'à la composition suivante du même ETF
+    periods = snapshots[['etf', 'date']].copy()
+    periods['start'] = periods['date']
+    periods['end'] = periods.groupby('etf')['date'].shift(-1).fillna(pd.Timestamp.max)
+    periods['from'] = periods['etf'].map(start)
+    periods = periods[periods['from'].notna() & (periods['end'] > periods['from'])]
+    periods['start'] = periods[['start', 'from']].max(axis=1)
+
+    needed = snapshots.merge(periods[['etf', 'date']], on=['etf', 'date'])
+    changed_snapshots = snapshots.merge(changed[['etf', 'date']], on=['etf', 'date'])
+    holdings = load_holdings(needed)
+    logging.info(f"{len(start)} ETFs à recalculer, {len(changed_snapshots)} compositions modifiées, "
+                 f"{len(needed)} compositions chargées.")
+
+    # Poids : les compositions modifiées ou supprimées remplacent les anciennes lignes
+    weights = load_table(weights_file, WEIGHT_COLUMNS)
+    stale = weights.set_index(['etf', 'date']).index.isin(changed.set_index(['etf', 'date']).index)
+    changed_holdings = holdings.merge(changed_snapshots[['etf', 'date']], on=['etf', 'date'])
+    weights = replace_rows(weights, stale, sector_weights(changed_holdings))
+
+    # Rendements : chaque ETF recalculé à partir de sa date de reprise
+    table = load_table(returns_file, RETURN_COLUMNS)
+    stale = table['date'] >= table['etf'].map(start).fillna(pd.Timestamp.max)
+    returns = returns[returns.index >= periods['start'].min()]
+    table = replace_rows(table, stale, sector_returns(holdings, periods, returns))
+
+    try:
+        weights.sort_values(['etf', 'date', 'sector']).to_parquet(weights_file, index=False)
+        table.sort_values(['etf', 'date', 'sector']).to_parquet(returns_file, index=False)
+        state = {
+            'holdings': {f"{row.etf}|{row.date:%Y-%m-%d}": row.hash for row in snapshots.itertuples()},
+            'last_price_date': last_price_date.strftime('%Y-%m-%d'),
+        }
+        with open(state_file, 'w', encoding='utf-8') as json_file:
+            json.dump(state, json_file, indent=4)
+    except Exception as e:
+        logging.error(f"Erreur lors de la sauvegarde des tables sector_data: {e}")
+        return
+    logging.info(f"Tables sector_data mises à jour en {time.perf_counter() - started:.2f} s "
+                 f"({len(weights)} lignes de poids, {len(table)} lignes de rendements).")
 
 def main():
-    print("Testing implementation for table: sector_data")
-    # TODO: Implement data retrieval and processing for sector_data
+    parser = argparse.ArgumentParser(description="Construit les tables de poids et de rendements sectoriels des ETFs.")
+    parser.add_argument('--holdings', default='holdings', help="répertoire des compositions <ETF>_<AAAAMMJJ>.csv")
+    parser.add_argument('--prices', default='constituent_prices.csv',
+                        help="cours des constituants (ticker, date, close_price) en CSV ou JSON")
+    parser.add_argument('--weights-output', default='sector_weights.parquet')
+    parser.add_argument('--returns-output', default='sector_returns.parquet')
+    parser.add_argument('--state', default='sector_state.json')
+    args = parser.parse_args()
+
+    logging.info("Calcul des données sectorielles")
+    build_sector_data(args.holdings, args.prices, args.weights_output, args.returns_output, args.state)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,284 @@
+import os
+import glob
+import json
+import hashlib
+import logging
+import argparse
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from schema import CATEGORY, EPOCH, FLOAT32, INT64, SCHEMAS, apply_schema, bigquery_schema, get_schema
+from table_io import load_table
+
+# Étape de chargement : chaque table est écrite en fichiers de staging prêts pour un
+# chargement BigQuery (bq load / LOAD DATA), partitionnés par période de l'horodatage
+# (disposition Hive : <table>/month=2024-10/part-00000.parquet, périodes UTC), avec le schéma
+# BigQuery de la table (<table>/_schema.json). Le manifeste (<table>/_manifest.json)
+# garde l'empreinte de chaque partition chargée : une partition inchangée n'est pas
+# réécrite, une relance est donc idempotente.
+PARQUET = 'parquet'
+AVRO = 'avro'
+
+# Granularités de partitionnement BigQuery : clé de partition et format de la période
+PARTITIONINGS = {
+    'day': ('date', '%Y-%m-%d'),
+    'month': ('month', '%Y-%m'),
+    'year': ('year', '%Y'),
+}
+
+# Taille visée pour chaque fichier de staging
+TARGET_FILE_SIZE = 128 * 1024 ** 2
+
+# Tables et fichiers sources par défaut (chemins relatifs à dataset_bigquery)
+DEFAULT_SOURCES = {
+    'economic_data': ['economic_data/economic_data.json'],
+    'etf_market_data': ['etf_market_data/real_time_data_*.json'],
+}
+
+AVRO_TYPES = {
+    CATEGORY: 'string',
+    EPOCH: {'type': 'long', 'logicalType': 'timestamp-micros'},
+    FLOAT32: 'float',
+    INT64: 'long',
+}
+
+class LocalBucket:
+    """
+    Répertoire local tenant lieu de bucket de l'entrepôt. Le chargeur n'utilise que
+    ces méthodes, sur des clés de la forme '<table>/<partition>/<fichier>' :
+    un client de bucket distant peut le remplacer.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def read_bytes(self, key):
+        with open(self.path(key), 'rb') as file:
+            return file.read()
+
+    @contextmanager
+    def open_write(self, key):
+        """
+        Écriture atomique : l'objet n'apparaît qu'une fois entièrement écrit.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                yield file
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def write_bytes(self, key, data):
+        with self.open_write(key) as file:
+            file.write(data)
+
+    def size(self, key):
+        return os.path.getsize(self.path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+def load_manifest(bucket, table):
+    key = f'{table}/_manifest.json'
+    if not bucket.exists(key):
+        return {'table': table, 'partitioning': None, 'partitions': {}}
+    return json.loads(bucket.read_bytes(key))
+
+def save_manifest(bucket, table, manifest):
+    bucket.write_bytes(f'{table}/_manifest.json', json.dumps(manifest, indent=4).encode('utf-8'))
+
+def partition_hash(part):
+    """
+    Empreinte du contenu d'une partition (indépendante de l'ordre des colonnes).
+    """
+    part = part[sorted(part.columns)]
+    hashes = pd.util.hash_pandas_object(part, index=False).to_numpy()
+    digest = hashlib.sha256(hashes.tobytes())
+    digest.update(','.join(part.columns).encode('utf-8'))
+    return digest.hexdigest()
+
+def to_arrow(part, table):
+    """
+    Table Arrow au format de chargement : tickers en chaînes, horodatage en
+    TIMESTAMP (microsecondes, UTC).
+    """
+    schema = get_schema(table)
+    columns = {}
+    for column in part.columns:
+        kind = schema.get(column)
+        if kind == CATEGORY:
+            columns[column] = pa.array(part[column].astype(object).to_numpy(), type=pa.string())
+        elif kind == EPOCH:
+            columns[column] = pa.array(part[column].to_numpy() * 1_000_000, type=pa.timestamp('us', tz='UTC'))
+        else:
+            columns[column] = pa.array(part[column].to_numpy())
+    return pa.table(columns)
+
+def write_parquet(bucket, key, data):
+    with bucket.open_write(key) as file:
+        pq.write_table(data, file, compression='snappy')
+
+def write_avro(bucket, key, data, table):
+    try:
+        import fastavro
+    except ImportError:
+        raise RuntimeError("Le format Avro nécessite le paquet fastavro (pip install fastavro)") from None
+    schema = get_schema(table)
+    fields = []
+    for name in data.column_names:
+        kind = schema[name]
+        avro_type = AVRO_TYPES[kind]
+        fields.append({'name': name, 'type': avro_type if kind in (CATEGORY, EPOCH) else ['null', avro_type]})
+    avro_schema = fastavro.parse_schema({'type': 'record', 'name': table, 'fields': fields})
+    # Les horodatages sont écrits en microsecondes entières
+    columns = {name: (data.column(name).cast(pa.int64()) if pa.types.is_timestamp(data.column(name).type)
+                      else data.column(name)).to_pylist() for name in data.column_names}
+    records = (dict(zip(columns, row)) for row in zip(*columns.values()))
+    with bucket.open_write(key) as file:
+        fastavro.writer(file, avro_schema, records, codec='deflate')
+
+def write_files(bucket, prefix, part, table, file_format, target_file_size, bytes_per_row):
+    """
+    Écrit une partition en fichiers d'environ `target_file_size` octets. La taille
+    par ligne, estimée au départ, est corrigée après chaque fichier écrit.
+    Retourne (clés des fichiers, taille par ligne mesurée).
+    """
+    data = to_arrow(part, table)
+    keys = []
+    start = 0
+    while start < len(data):
+        rows = max(1, int(target_file_size // bytes_per_row))
+        batch = data.slice(start, rows)
+        key = f'{prefix}/part-{len(keys):05d}.{file_format}'
+        if file_format == AVRO:
+            write_avro(bucket, key, batch, table)
+        else:
+            write_parquet(bucket, key, batch)
+        bytes_per_row = bucket.size(key) / len(batch)
+        keys.append(key)
+        start += len(batch)
+    return keys, bytes_per_row
+
+def stage_table(data, table, bucket, file_format=PARQUET, partitioning='month',
+                target_file_size=TARGET_FILE_SIZE):
+    """
+    Écrit la table typée `data` en fichiers de staging partitionnés dans `bucket`.
+    Seules les colonnes du schéma de la table sont chargées : le fichier de schéma et
+    les fichiers de staging décrivent donc toujours les mêmes colonnes.
+    Seules les partitions nouvelles ou modifiées sont écrites ; le manifeste est
+    enregistré après chaque partition, une relance reprend donc là où elle s'est arrêtée.
+    Retourne (partitions écrites, partitions inchangées).
+    """
+    if partitioning not in PARTITIONINGS:
+        raise ValueError(f"Partitionnement inconnu: {partitioning}")
+    partition_key, period_format = PARTITIONINGS[partitioning]
+    manifest = load_manifest(bucket, table)
+    if manifest['partitioning'] not in (None, partitioning):
+        raise ValueError(f"La table {table} est déjà partitionnée par {manifest['partitioning']}")
+    manifest['partitioning'] = partitioning
+
+    schema = get_schema(table)
+    ignored = [column for column in data.columns if column not in schema]
+    if ignored:
+        logging.warning(f"Table {table}: colonnes hors schéma ignorées: {', '.join(map(str, ignored))}")
+    data = data[[column for column in schema if column in data.columns]]
+    data = data.sort_values([column for column in ('timestamp', 'ticker') if column in data.columns],
+                            ignore_index=True)
+    bucket.write_bytes(f'{table}/_schema.json',
+                       json.dumps(bigquery_schema(table, data.columns), indent=4).encode('utf-8'))
+    # Périodes en UTC, comme le partitionnement BigQuery d'une colonne TIMESTAMP
+    periods = pd.to_datetime(data['timestamp'], unit='s', utc=True).dt.strftime(period_format).to_numpy()
+
+    # Estimation de départ : taille Arrow non compressée, donc des fichiers plutôt petits
+    bytes_per_row = max(to_arrow(data.head(1000), table).nbytes / max(min(len(data), 1000), 1), 1)
+    written = unchanged = 0
+    for period, index in pd.Series(np.arange(len(data))).groupby(periods, sort=True):
+        part = data.iloc[index.to_numpy()]
+        digest = partition_hash(part)
+        entry = manifest['partitions'].get(period)
+        if entry is not None and entry['hash'] == digest and entry['format'] == file_format \
+                and all(bucket.exists(key) for key in entry['files']):
+            unchanged += 1
+            continue
+
+        prefix = f'{table}/{partition_key}={period}'
+        keys, bytes_per_row = write_files(bucket, prefix, part, table, file_format,
+                                          target_file_size, bytes_per_row)
+        for key in set(entry['files'] if entry else []) - set(keys):
+            bucket.delete(key)
+        manifest['partitions'][period] = {
+            'hash': digest,
+            'format': file_format,
+            'files': keys,
+            'rows': len(part),
+            'staged_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        save_manifest(bucket, table, manifest)
+        written += 1
+    save_manifest(bucket, table, manifest)
+    return written, unchanged
+
+def load_sources(table, patterns):
+    """
+    Charge et réunit les fichiers sources d'une table (motifs glob acceptés).
+    Une ligne présente dans plusieurs fichiers (même ticker, même instant) n'est gardée qu'une fois.
+    """
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        raise FileNotFoundError(f"Aucun fichier source pour la table {table}: {', '.join(patterns)}")
+    frames = [load_table(path, table) for path in paths]
+    data = apply_schema(pd.concat(frames, ignore_index=True), table)
+    keys = [column for column in ('ticker', 'timestamp') if column in data.columns]
+    return data.drop_duplicates(subset=keys, keep='last', ignore_index=True)
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Écrit les tables en fichiers de staging prêts pour BigQuery.")
+    parser.add_argument('--bucket', default='warehouse', help="répertoire tenant lieu de bucket")
+    parser.add_argument('--table', action='append', choices=sorted(SCHEMAS),
+                        help="table à charger (toutes par défaut)")
+    parser.add_argument('--source', nargs='+', help="fichiers sources de la table (une seule --table)")
+    parser.add_argument('--format', choices=[PARQUET, AVRO], default=PARQUET)
+    parser.add_argument('--partitioning', choices=sorted(PARTITIONINGS), default='month')
+    parser.add_argument('--target-file-size', type=int, default=TARGET_FILE_SIZE, help="en octets")
+    args = parser.parse_args()
+
+    tables = args.table or sorted(DEFAULT_SOURCES)
+    if args.source and len(tables) != 1:
+        parser.error("--source s'utilise avec une seule --table")
+    if not args.source and any(table not in DEFAULT_SOURCES for table in tables):
+        parser.error("--source est nécessaire pour une table sans fichiers sources par défaut")
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    bucket = LocalBucket(args.bucket)
+    for table in tables:
+        patterns = args.source or [os.path.join(base_dir, pattern) for pattern in DEFAULT_SOURCES[table]]
+        try:
+            data = load_sources(table, patterns)
+            written, unchanged = stage_table(data, table, bucket, args.format, args.partitioning,
+                                             args.target_file_size)
+            logging.info(f"Table {table}: {written} partitions écrites, {unchanged} inchangées.")
+        except Exception as e:
+            logging.error(f"Erreur lors du chargement de la table {table}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import os
+import json
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+
+from schema import apply_schema, json_frame, read_dtypes
+
+# Lecture et écriture des tables de dataset_bigquery quel que soit leur format de
+# stockage. À la lecture, le format est reconnu au contenu du fichier (puis à son
+# extension) et les colonnes sont lues avec les types du schéma de la table, sans
+# inférence. L'écriture se fait par paquets de lignes : la mémoire utilisée dépend
+# de la taille des paquets, pas de celle de la table.
+JSON = 'json'
+NDJSON = 'ndjson'
+PARQUET = 'parquet'
+FEATHER = 'feather'
+
+EXTENSIONS = {
+    '.json': JSON,
+    '.ndjson': NDJSON,
+    '.jsonl': NDJSON,
+    '.parquet': PARQUET,
+    '.feather': FEATHER,
+    '.arrow': FEATHER,
+}
+
+# Compression des fichiers JSON / NDJSON : extension et signature
+COMPRESSIONS = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+COMPRESSION_MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+}
+
+# Lignes écrites à la fois (et taille des row groups Parquet)
+CHUNK_SIZE = 65536
+
+ARROW_TYPES = {
+    'str': pa.string(),
+    'int64': pa.int64(),
+    'float64': pa.float64(),
+}
+
+# Tables décodées, par (chemin, table) : (mtime, taille, DataFrame typé)
+_cache = {}
+_cache_lock = threading.Lock()
+
+def detect_compression(path):
+    with open(path, 'rb') as file:
+        head = file.read(4)
+    return next((name for magic, name in COMPRESSION_MAGIC.items() if head.startswith(magic)), None)
+
+def open_input(path):
+    """
+    Flux de lecture du fichier, décompressé s'il est en gzip ou zstd.
+    """
+    return pa.input_stream(path, compression=detect_compression(path))
+
+def detect_format(path):
+    """
+    Format d'un fichier de table : signature binaire (Parquet, Arrow / Feather),
+    premier caractère d'un fichier JSON ('[' pour un tableau, '{' pour du NDJSON),
+    sinon extension.
+    """
+    with open_input(path) as stream:
+        head = stream.read(64)
+    if head.startswith(b'PAR1'):
+        return PARQUET
+    if head.startswith((b'ARROW1', b'FEA1')):
+        return FEATHER
+    text = head.lstrip()
+    if text.startswith(b'['):
+        return JSON
+    if text.startswith(b'{'):
+        return NDJSON
+    extension = os.path.splitext(split_compression(path)[0])[1].lower()
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+    raise ValueError(f"Format de fichier non reconnu: {path}")
+
+def first_line(path, block_size=1 << 16):
+    with open_input(path) as stream:
+        line = b''
+        while b'\n' not in line:
+            block = stream.read(block_size)
+            if not block:
+                break
+            line += block
+    return line.split(b'\n', 1)[0]
+
+def read_json_records(path, table):
+    with open_input(path) as stream:
+        return pd.read_json(stream, dtype=read_dtypes(table), convert_dates=False)
+
+def read_ndjson(path, table):
+    # Schéma explicite restreint aux champs présents (ceux du premier enregistrement) :
+    # pyarrow ajouterait sinon les colonnes absentes, vides
+    first = json.loads(first_line(path) or b'{}')
+    schema = pa.schema([(column, ARROW_TYPES[dtype]) for column, dtype in read_dtypes(table).items()
+                        if column in first])
+    options = pa_json.ParseOptions(explicit_schema=schema, unexpected_field_behavior='infer')
+    with open_input(path) as stream:
+        return pa_json.read_json(stream, parse_options=options).to_pandas()
+
+READERS = {
+    JSON: read_json_records,
+    NDJSON: read_ndjson,
+    PARQUET: lambda path, table: pd.read_parquet(path),
+    FEATHER: lambda path, table: pd.read_feather(path),
+}
+
+def decode_table(path, table):
+    """
+    Lit un fichier entier et le convertit au schéma de `table`, via le cache du processus.
+    """
+    key = (os.path.realpath(path), table)
+    stat = os.stat(path)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    file_format = detect_format(path)
+    data = apply_schema(READERS[file_format](path, table), table)
+    logging.debug(f"Table {table} décodée depuis {path} ({file_format}, {len(data)} lignes)")
+    with _cache_lock:
+        _cache[key] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+def load_table(path, table, columns=None, tickers=None):
+    """
+    Charge une table (JSON, NDJSON, Parquet ou Feather) au schéma de `table`.
+    `columns` et `tickers` restreignent les colonnes et les tickers retournés.
+    Le fichier n'est décodé qu'une fois par processus tant qu'il n'est pas modifié ;
+    chaque appel retourne une copie, que l'appelant peut modifier.
+    """
+    data = decode_table(path, table)
+    if tickers is not None:
+        data = data[data['ticker'].isin(tickers)]
+        data = data.assign(ticker=data['ticker'].cat.remove_unused_categories()).reset_index(drop=True)
+    if columns is not None:
+        data = data[list(columns)]
+    return data.copy()
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+def split_compression(path):
+    """
+    (chemin sans extension de compression, compression) : 'a.ndjson.zst' -> ('a.ndjson', 'zstd').
+    """
+    root, extension = os.path.splitext(path)
+    if extension.lower() in COMPRESSIONS:
+        return root, COMPRESSIONS[extension.lower()]
+    return path, None
+
+def output_format(path):
+    """
+    Format et compression d'écriture déduits du nom de fichier (NDJSON par défaut).
+    """
+    root, compression = split_compression(path)
+    return EXTENSIONS.get(os.path.splitext(root)[1].lower(), NDJSON), compression
+
+def iter_chunks(data, chunk_size=CHUNK_SIZE):
+    for start in range(0, len(data), chunk_size):
+        yield data.iloc[start:start + chunk_size]
+
+def json_lines(chunk):
+    """
+    Enregistrements JSON d'un paquet de lignes, construits colonne par colonne.
+    Les valeurs manquantes ou non finies (NaN, ±inf) deviennent null.
+    """
+    frame = json_frame(chunk)
+    columns = []
+    for column in frame.columns:
+        values = frame[column].to_numpy(dtype=object, copy=True)
+        missing = frame[column].isna().to_numpy(copy=True)
+        if pd.api.types.is_float_dtype(frame[column]):
+            missing |= ~np.isfinite(frame[column].to_numpy())
+        values[missing] = None
+        columns.append(values.tolist())
+    names = list(frame.columns)
+    for row in zip(*columns):
+        yield json.dumps(dict(zip(names, row)), ensure_ascii=False, allow_nan=False)
+
+def write_json(data, path, compression=None, chunk_size=CHUNK_SIZE, lines=True):
+    """
+    Écrit la table en NDJSON (`lines`) ou en tableau JSON, paquet par paquet.
+    """
+    with pa.output_stream(path, compression=compression) as stream:
+        first = True
+        if not lines:
+            stream.write(b'[')
+        for chunk in iter_chunks(data, chunk_size):
+            records = list(json_lines(chunk))
+            if lines:
+                text = ''.join(record + '\n' for record in records)
+            else:
+                text = ('' if first else ', ') + ', '.join(records)
+            stream.write(text.encode('utf-8'))
+            first = False
+        if not lines:
+            stream.write(b']')
+
+def write_parquet(data, path, compression=None, chunk_size=CHUNK_SIZE):
+    """
+    Écrit la table typée en Parquet, un row group par paquet de lignes.
+    """
+    schema = pa.Schema.from_pandas(data, preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression=compression or 'snappy') as writer:
+        for chunk in iter_chunks(data, chunk_size):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False),
+                               row_group_size=chunk_size)
+
+def write_table(data, path, file_format=None, compression=None, chunk_size=CHUNK_SIZE):
+    """
+    Écrit une table typée en JSON, NDJSON ou Parquet. Format et compression (gzip,
+    zstd) sont déduits du nom de fichier s'ils ne sont pas donnés. Le fichier est
+    écrit à côté puis renommé : une écriture interrompue ne laisse pas de fichier tronqué.
+    """
+    detected_format, detected_compression = output_format(path)
+    file_format = file_format or detected_format
+    compression = compression or detected_compression
+    if file_format not in (PARQUET, JSON, NDJSON):
+        raise ValueError(f"Format d'écriture non pris en charge: {file_format}")
+    tmp_path = path + '.tmp'
+    try:
+        if file_format == PARQUET:
+            write_parquet(data, tmp_path, compression, chunk_size)
+        else:
+            write_json(data, tmp_path, compression, chunk_size, lines=file_format == NDJSON)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -40,7 +40,7 @@ def calculate_adx(data, window=14):
         data['DX'] = 100 * (abs(data['+DI'] - data['-DI']) / (data['+DI'] + data['-DI']))
         data['ADX'] = data['DX'].rolling(window=window).mean()
         
-        return data[['ticker', 'date', 'datetime', 'ADX']]
+        return data[['ticker', 'timestamp', 'ADX']]
     
     except Exception as e:
         logging.error(f"Erreur lors du calcul de l'ADX: {e}")
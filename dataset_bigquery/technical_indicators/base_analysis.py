@@ -1,29 +1,41 @@
-import json
+import os
+import sys
 import logging
 import pandas as pd
 
-def load_data(json_file):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+from schema import apply_schema, from_epoch, log_footprint
+from table_io import CHUNK_SIZE, load_table, write_table
+
+def load_data(path, table='economic_data', columns=None, tickers=None):
+    """
+    Charge une table (JSON, NDJSON, Parquet ou Feather) avec les types de son schéma.
+    Le fichier décodé reste en cache : les indicateurs suivants ne le relisent pas.
+    """
     try:
-        with open(json_file, 'r') as file:
-            data = pd.read_json(file)
-        logging.info(f"Données chargées depuis {json_file}")
+        data = load_table(path, table, columns=columns, tickers=tickers)
+        logging.info(f"Données chargées depuis {path}")
+        log_footprint(data, table)
         return data
     except Exception as e:
         logging.error(f"Erreur lors du chargement des données : {e}")
         return None
 
-def save_analysis(data, output_file):
+def save_analysis(data, output_file, table='technical_indicators', file_format=None, compression=None,
+                  chunk_size=CHUNK_SIZE):
+    """
+    Écrit l'analyse par paquets de `chunk_size` lignes : JSON, NDJSON ou Parquet
+    (format et compression gzip / zstd déduits de l'extension s'ils ne sont pas donnés).
+    """
     try:
-        with open(output_file, 'w') as file:
-            json.dump(data.to_dict(orient='records'), file)
+        write_table(apply_schema(data, table), output_file, file_format, compression, chunk_size)
         logging.info(f"Analyse sauvegardée dans {output_file}")
     except Exception as e:
         logging.error(f"Erreur lors de la sauvegarde de l'analyse : {e}")
 
 def add_datetime_index(data):
     try:
-        data['datetime'] = pd.to_datetime(data['date'])
-        data.set_index('datetime', inplace=True)
+        data.index = pd.DatetimeIndex(from_epoch(data['timestamp'].to_numpy()), name='datetime')
         return data
     except Exception as e:
         logging.error(f"Erreur lors de l'ajout de l'index datetime : {e}")
@@ -8,7 +8,7 @@ def calculate_bollinger_bands(data, window=20):
         stddev = data['close_price'].rolling(window=window).std()
         data['Upper_Band'] = sma + (stddev * 2)
         data['Lower_Band'] = sma - (stddev * 2)
-        return data[['ticker', 'date', 'datetime', 'Upper_Band', 'Lower_Band']]
+        return data[['ticker', 'timestamp', 'Upper_Band', 'Lower_Band']]
     except Exception as e:
         logging.error(f"Erreur lors du calcul des bandes de Bollinger: {e}")
         return None
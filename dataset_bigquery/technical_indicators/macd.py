@@ -8,7 +8,7 @@ def calculate_macd(data, short_window=12, long_window=26, signal_window=9):
         ema_long = data['close_price'].ewm(span=long_window, adjust=False).mean()
         data['MACD'] = ema_short - ema_long
         data['Signal_Line'] = data['MACD'].ewm(span=signal_window, adjust=False).mean()
-        return data[['ticker', 'date', 'datetime', 'MACD', 'Signal_Line']]
+        return data[['ticker', 'timestamp', 'MACD', 'Signal_Line']]
     except Exception as e:
         logging.error(f"Erreur lors du calcul du MACD: {e}")
         return None
@@ -6,7 +6,7 @@ def calculate_moving_averages(data, window_sma=20, window_ema=20):
     try:
         data['SMA'] = data['close_price'].rolling(window=window_sma).mean()
         data['EMA'] = data['close_price'].ewm(span=window_ema, adjust=False).mean()
-        return data[['ticker', 'date', 'datetime', 'SMA', 'EMA']]
+        return data[['ticker', 'timestamp', 'SMA', 'EMA']]
     except Exception as e:
         logging.error(f"Erreur lors du calcul des moyennes mobiles: {e}")
         return None
@@ -12,7 +12,7 @@ def calculate_rsi(data, window=14):
 
         rs = avg_gain / avg_loss
         data['RSI'] = 100 - (100 / (1 + rs))
-        return data[['ticker', 'date', 'RSI']]
+        return data[['ticker', 'timestamp', 'RSI']]
     except Exception as e:
         logging.error(f"Erreur lors du calcul du RSI: {e}")
         return None
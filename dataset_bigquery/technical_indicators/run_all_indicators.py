@@ -1,23 +1,58 @@
-import logging
-import subprocess
 import os
+import sys
+import time
+import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 SCRIPTS_DIR = os.path.dirname(os.path.realpath(__file__))
+INPUT_FILE = os.path.join(SCRIPTS_DIR, '..', 'economic_data', 'economic_data.json')
+
+# Les indicateurs sont importés depuis la racine du dépôt (placée en dernier dans sys.path)
+sys.path.append(os.path.join(SCRIPTS_DIR, '..', '..'))
+from dataset_bigquery.technical_indicators.base_analysis import load_data, save_analysis
+from dataset_bigquery.technical_indicators.moving_averages import calculate_moving_averages
+from dataset_bigquery.technical_indicators.rsi import calculate_rsi
+from dataset_bigquery.technical_indicators.bollinger_bands import calculate_bollinger_bands
+from dataset_bigquery.technical_indicators.macd import calculate_macd
+from dataset_bigquery.technical_indicators.stochastic import calculate_stochastic
+from dataset_bigquery.technical_indicators.adx import calculate_adx
+
+# Indicateur -> (fonction de calcul, fichier de sortie du script correspondant)
+INDICATORS = {
+    'moving_averages': (calculate_moving_averages, 'moving_averages_analysis.json'),
+    'rsi': (calculate_rsi, os.path.join('results', 'rsi.json')),
+    'bollinger_bands': (calculate_bollinger_bands, 'bollinger_bands_analysis.json'),
+    'macd': (calculate_macd, 'macd_analysis.json'),
+    'stochastic': (calculate_stochastic, 'stochastic_analysis.json'),
+    'adx': (calculate_adx, 'adx_analysis.json'),
+}
+
+def run_indicator(name, data):
+    """
+    Calcule un indicateur sur une copie des données déjà chargées et l'enregistre.
+    """
+    calculate, output_file = INDICATORS[name]
+    output_file = os.path.join(SCRIPTS_DIR, output_file)
+    started = time.perf_counter()
+    analyzed_data = calculate(data.copy())
+    if analyzed_data is None:
+        logging.error(f"Erreur lors du calcul de l'indicateur {name}.")
+        return
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    save_analysis(analyzed_data, output_file)
+    logging.info(f"Indicateur {name} calculé en {time.perf_counter() - started:.2f} s.")
 
-def run_script(script_name):
-    script_path = os.path.join(SCRIPTS_DIR, f"{script_name}.py")
-    if os.path.exists(script_path):
-        try:
-            subprocess.run(['python', script_path], check=True)
-            logging.info(f"Script {script_name}.py exécuté avec succès.")
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Erreur lors de l'exécution de {script_name}.py: {e}")
-    else:
-        logging.error(f"Script {script_name}.py non trouvé dans {SCRIPTS_DIR}.")
+def run_all(input_file=INPUT_FILE, indicators=tuple(INDICATORS)):
+    """
+    Charge la table une seule fois puis calcule tous les indicateurs dans ce processus.
+    """
+    data = load_data(input_file)
+    if data is None:
+        logging.error(f"Impossible de charger {input_file}. Arrêt du calcul des indicateurs.")
+        return
+    for name in indicators:
+        run_indicator(name, data)
 
 if __name__ == "__main__":
-    scripts = ['moving_averages', 'rsi', 'bollinger_bands', 'macd', 'stochastic', 'adx']
-    for script in scripts:
-        run_script(script)
+    run_all()
@@ -12,7 +12,7 @@ def calculate_stochastic(data, window=14, smooth_window=3):
         high_max = data['high_price'].rolling(window=window).max()
         data['%K'] = 100 * ((data['close_price'] - low_min) / (high_max - low_min))
         data['%D'] = data['%K'].rolling(window=smooth_window).mean()
-        return data[['ticker', 'date', 'datetime', '%K', '%D']]
+        return data[['ticker', 'timestamp', '%K', '%D']]
     except Exception as e:
         logging.error(f"Erreur lors du calcul de l'oscillateur stochastique: {e}")
         return None
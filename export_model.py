@@ -0,0 +1,119 @@
+import os
+import json
+import argparse
+
+import numpy as np
+
+from main import FEATURE_COLUMNS, get_spy_data, train_model
+
+ARTIFACT_NAME = 'forecaster'
+
+
+def _unrolled_copy(model):
+    """
+    Recrée le modèle avec des couches LSTM déroulées et les mêmes poids.
+    La boucle `while` d'un LSTM Keras 3 lit ses poids comme variables, ce que
+    TFLite ne sait pas figer ; déroulée sur la fenêtre (fixe), elle disparaît.
+    """
+    from tensorflow.keras.models import Sequential
+
+    config = model.get_config()
+    for layer in config['layers']:
+        if layer['class_name'] == 'LSTM':
+            layer['config']['unroll'] = True
+    unrolled = Sequential.from_config(config)
+    unrolled.set_weights(model.get_weights())
+    return unrolled
+
+
+def _serving_function(model, window_size, n_features):
+    """
+    Fige le modèle Keras dans une tf.function à signature fixe.
+    """
+    import tensorflow as tf
+
+    @tf.function(input_signature=[tf.TensorSpec([None, window_size, n_features], tf.float32, name='window')])
+    def serve(window):
+        return {'close': model(window, training=False)}
+
+    return serve
+
+
+def export_forecaster(model, scaler, output_dir, window_size=60, fmt='tflite',
+                      quantize=None, representative_windows=None):
+    """
+    Exporte le LSTM entraîné et son scaler dans un artefact d'inférence compact :
+    - fmt='tflite' : `forecaster.tflite`, avec quantification int8 optionnelle
+      (poids et activations, calibrée sur `representative_windows`) ;
+    - fmt='savedmodel' : un SavedModel exposant la signature 'serving_default'.
+    Les paramètres du scaler sont écrits dans `forecaster.json` pour que le
+    prédicteur n'ait besoin ni de scikit-learn ni de Keras.
+    """
+    import tensorflow as tf
+
+    os.makedirs(output_dir, exist_ok=True)
+    n_features = len(FEATURE_COLUMNS)
+
+    if fmt == 'savedmodel':
+        artifact = os.path.join(output_dir, ARTIFACT_NAME)
+        serve = _serving_function(model, window_size, n_features)
+        tf.saved_model.save(model, artifact, signatures={'serving_default': serve})
+    elif fmt == 'tflite':
+        # Le convertisseur fixe le lot à 1 ; le prédicteur passe les fenêtres une à une
+        converter = tf.lite.TFLiteConverter.from_keras_model(_unrolled_copy(model))
+        if quantize == 'int8':
+            if representative_windows is None:
+                raise ValueError("La quantification int8 nécessite des fenêtres représentatives.")
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.representative_dataset = lambda: (
+                [window[np.newaxis].astype(np.float32)] for window in representative_windows
+            )
+        elif quantize is not None:
+            raise ValueError(f"Quantification inconnue : {quantize}")
+        artifact = os.path.join(output_dir, f'{ARTIFACT_NAME}.tflite')
+        with open(artifact, 'wb') as file:
+            file.write(converter.convert())
+    else:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+
+    metadata = {
+        'format': fmt,
+        'quantize': quantize,
+        'window_size': window_size,
+        'feature_columns': FEATURE_COLUMNS,
+        'scaler_min': scaler.min_.tolist(),
+        'scaler_scale': scaler.scale_.tolist(),
+    }
+    with open(os.path.join(output_dir, f'{ARTIFACT_NAME}.json'), 'w', encoding='utf-8') as file:
+        json.dump(metadata, file, indent=4)
+
+    print(f"Modèle exporté dans {artifact}")
+    return artifact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraîne le LSTM et l'exporte en artefact d'inférence léger.")
+    parser.add_argument('--start-date', default='2020-01-01')
+    parser.add_argument('--end-date', default='2024-01-01')
+    parser.add_argument('--output-dir', default='export')
+    parser.add_argument('--format', choices=['tflite', 'savedmodel'], default='tflite')
+    parser.add_argument('--quantize', choices=['int8'], default=None)
+    parser.add_argument('--window-size', type=int, default=60)
+    parser.add_argument('--epochs', type=int, default=150)
+    args = parser.parse_args()
+
+    spy_data = get_spy_data(args.start_date, args.end_date).dropna().reset_index(drop=True)
+    model, scaler = train_model(spy_data, args.window_size, epochs=args.epochs)
+
+    representative_windows = None
+    if args.quantize == 'int8':
+        scaled = scaler.transform(spy_data[FEATURE_COLUMNS])
+        starts = np.linspace(0, len(scaled) - args.window_size, num=100, dtype=int)
+        representative_windows = [scaled[i:i + args.window_size] for i in starts]
+
+    export_forecaster(model, scaler, args.output_dir, args.window_size, args.format,
+                      args.quantize, representative_windows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,278 @@
-import pandas as pd
-import json
-import os
-import logging
-
-# Configuration du logging pour enregistrer les événements du parsing
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("json_parsing.log"),
-        logging.StreamHandler()
-    ]
-)
-
-def load_data(json_file):
-    print("Chargement des données à partir du fichier JSON...")
-    try:
-        with open(json_file, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        return data
-    except FileNotFoundError:
-        print(f"Erreur : Le fichier {json_file} n'a pas été trouvé.")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"Erreur : Le fichier {json_file} n'est pas un JSON valide. {e}")
-        return None
-
-def save_csv(data, output_file, data_type):
-    print(f"Sauvegarde des {data_type} dans {output_file}...")
-    try:
-        df = pd.DataFrame(data)
-        # Remplacer les NaN par None pour une meilleure compatibilité
-        df = df.where(pd.notnull(df), None)
-        df.to_csv(output_file, index=False, encoding='utf-8')
-        print(f"Les {data_type} ont été sauvegardés avec succès dans {output_file}.")
-    except Exception as e:
-        print(f"Erreur lors de la sauvegarde des {data_type} : {e}")
-
-def process_data(data):
-    indicators_list = []
-    anomalies_list = []
-
-    for ticker, content in data.items():
-        indicators = content.get('indicators', [])
-        anomalies = content.get('anomalies', [])
-
-        for indicator in indicators:
-            if 'date' in indicator:
-                del indicator['date']  # Supprimer la colonne 'date' pour éviter la duplication
-            indicator['ticker'] = ticker  # Ajouter le ticker pour référence
-            indicators_list.append(indicator)
-        
-        for anomaly in anomalies:
-            anomaly['ticker'] = ticker  # Ajouter le ticker pour référence
-            anomalies_list.append(anomaly)
-    
-    return indicators_list, anomalies_list
-
-def run_conversion(input_json, indicators_csv, anomalies_csv):
-    data = load_data(input_json)
-    if data is None:
-        print("Erreur lors du chargement des données. Arrêt de l'exécution.")
-        return
-    
-    indicators, anomalies = process_data(data)
-    
-    if indicators:
-        save_csv(indicators, indicators_csv, "indicateurs")
-    else:
-        print("Aucun indicateur à sauvegarder.")
-    
-    if anomalies:
-        save_csv(anomalies, anomalies_csv, "anomalies")
-    else:
-        print("Aucune anomalie à sauvegarder.")
-    
-    print("Conversion terminée.")
-
-if __name__ == "__main__":
-    # Chemin vers le fichier JSON d'entrée
-    input_json_file = "analysis_output.json"
-    # Chemins vers les fichiers CSV de sortie
-    indicators_csv_file = "indicators.csv"
-    anomalies_csv_file = "anomalies.csv"
-    run_conversion(input_json_file, indicators_csv_file, anomalies_csv_file)
+import os
+import re
+import csv
+import logging
+
+import ijson
+
+# Configuration du logging pour enregistrer les événements du parsing
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(message)s',
+    handlers=[
+        logging.FileHandler("json_parsing.log"),
+        logging.StreamHandler()
+    ]
+)
+
+# Nombre de lignes CSV écrites à la fois
+CHUNK_SIZE = 10000
+
+# Enregistrements du fichier d'analyse : {ticker: {"indicators": [...], "anomalies": [...]}}
+RECORD_KINDS = ('indicators', 'anomalies')
+
+# Texte JSON sans valeur non finie, parcouru d'un seul tenant : caractères hors chaîne
+# (hors N / I / -, qui peuvent commencer NaN / Infinity / -Infinity), signe d'un nombre,
+# chaînes complètes. Le contenu des chaînes n'est donc jamais modifié.
+_FINITE_TEXT = re.compile(rb'(?:[^"NI-]+|-(?=[0-9])|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+# Valeurs non finies écrites par json.dump (NaN, Infinity : invalides en JSON strict).
+# Les infinis passent par des chaînes réservées (le parser C refuse 1e999), reconverties
+# en nombres au fil des événements
+_NON_FINITE_TOKENS = {
+    b'NaN': b'null',
+    b'Infinity': b'"\\u0000Infinity"',
+    b'-Infinity': b'"\\u0000-Infinity"',
+}
+NON_FINITE_STRINGS = {
+    '\x00Infinity': float('inf'),
+    '\x00-Infinity': float('-inf'),
+}
+_LONGEST_TOKEN = max(map(len, _NON_FINITE_TOKENS))
+
+class NonFiniteFilter:
+    """
+    Lecture en flux d'un fichier JSON pour le parser incrémental : hors des chaînes,
+    NaN devient null et ±Infinity une chaîne réservée (voir NON_FINITE_STRINGS).
+    Une chaîne ou une valeur non finie coupée par la fin d'un bloc est gardée pour
+    la lecture suivante.
+    """
+
+    def __init__(self, file, block_size=1 << 16):
+        self.file = file
+        self.block_size = block_size
+        self.pending = b''
+
+    def read(self, size=-1):
+        # ijson appelle read(0) pour savoir si le flux est binaire
+        if size == 0:
+            return b''
+        while True:
+            block = self.file.read(self.block_size)
+            self.pending += block
+            data = self.convert(final=not block)
+            if data or not block:
+                return data
+
+    def convert(self, final):
+        """
+        Retire du tampon sa partie complète et la retourne convertie.
+        """
+        buffer = self.pending
+        parts, emitted, position = [], 0, 0
+        while True:
+            position = _FINITE_TEXT.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            token = next((token for token in _NON_FINITE_TOKENS if buffer.startswith(token, position)), None)
+            if token is not None:
+                parts += [buffer[emitted:position], _NON_FINITE_TOKENS[token]]
+                position = emitted = position + len(token)
+            elif final or (buffer[position:position + 1] != b'"' and len(buffer) - position >= _LONGEST_TOKEN):
+                # JSON invalide : transmis tel quel, le parser signalera l'erreur
+                position += 1
+            else:
+                # Chaîne inachevée ou valeur coupée : attend la suite du fichier
+                break
+        parts.append(buffer[emitted:position])
+        self.pending = buffer[position:]
+        return b''.join(parts)
+
+def iter_events(json_file, block_size=1 << 16):
+    with open(json_file, 'rb') as file:
+        for prefix, event, value in ijson.parse(NonFiniteFilter(file, block_size), use_float=True):
+            if event == 'string' and value in NON_FINITE_STRINGS:
+                event, value = 'number', NON_FINITE_STRINGS[value]
+            yield prefix, event, value
+
+def record_prefix(prefix):
+    """
+    Retourne (ticker, type) si `prefix` désigne un enregistrement, sinon None.
+    """
+    parts = prefix.rsplit('.', 2)
+    if len(parts) == 3 and parts[1] in RECORD_KINDS and parts[2] == 'item':
+        return parts[0], parts[1]
+    return None
+
+def iter_records(json_file):
+    """
+    Enregistrements (ticker, type, dict) construits un par un au fil du parsing.
+    """
+    builder = None
+    for prefix, event, value in iter_events(json_file):
+        if builder is not None:
+            if event == 'end_map' and prefix == current_prefix:
+                yield ticker, kind, builder.value
+                builder = None
+            else:
+                builder.event(event, value)
+        elif event == 'start_map':
+            record = record_prefix(prefix)
+            if record:
+                ticker, kind = record
+                current_prefix = prefix
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+
+def to_cell(value):
+    # None (NaN d'origine) donne une cellule vide, comme pandas
+    if value is None:
+        return ''
+    return str(value) if isinstance(value, (dict, list)) else value
+
+# Types d'une colonne que pandas lisait en float64 (entiers compris)
+FLOAT_TYPES = {int, float, type(None)}
+
+def rewrite_csv(source_file, target_file, columns, float_columns):
+    """
+    Réécrit un CSV en flux avec l'en-tête complet (les lignes écrites avant l'apparition
+    d'une colonne sont complétées à vide) et les entiers des colonnes `float_columns`
+    écrits en flottants ('1' -> '1.0').
+    """
+    positions = [columns.index(column) for column in float_columns]
+    with open(source_file, 'r', newline='', encoding='utf-8') as source, \
+            open(target_file, 'w', newline='', encoding='utf-8') as target:
+        reader, writer = csv.reader(source), csv.writer(target)
+        next(reader)
+        writer.writerow(columns)
+        for row in reader:
+            row += [''] * (len(columns) - len(row))
+            for position in positions:
+                if row[position]:
+                    row[position] = str(float(row[position]))
+            writer.writerow(row)
+
+class CsvChunkWriter:
+    """
+    Écrit des enregistrements dans un CSV par paquets de `chunk_size` lignes.
+    Les colonnes sont celles des enregistrements, dans l'ordre d'apparition.
+    Les lignes sont écrites dans un fichier temporaire, qui ne remplace `csv_file`
+    qu'à la fermeture (`close(commit=True)`) : une conversion interrompue laisse
+    le CSV existant intact.
+    """
+
+    def __init__(self, csv_file, chunk_size=CHUNK_SIZE):
+        self.csv_file = csv_file
+        self.tmp_file = csv_file + '.tmp'
+        self.chunk_size = chunk_size
+        self.file = open(self.tmp_file, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.columns = []
+        self.types = {}
+        self.header_written = False
+        self.header_complete = True
+        self.chunk = []
+        self.count = 0
+
+    def write(self, record):
+        new_columns = [column for column in record if column not in self.types]
+        if new_columns:
+            self.columns.extend(new_columns)
+            for column in new_columns:
+                # Les lignes précédentes n'ont pas cette colonne
+                self.types[column] = {type(None)} if self.count or self.chunk else set()
+            self.header_complete = not self.header_written
+        values = [record.get(column) for column in self.columns]
+        for column, value in zip(self.columns, values):
+            self.types[column].add(type(value))
+        self.chunk.append([to_cell(value) for value in values])
+        if len(self.chunk) >= self.chunk_size:
+            self.flush()
+
+    def float_columns(self):
+        """
+        Colonnes d'entiers que pandas lisait en float64 : entiers mêlés de flottants
+        ou de valeurs manquantes.
+        """
+        return [column for column in self.columns
+                if int in self.types[column] and len(self.types[column]) > 1
+                and self.types[column] <= FLOAT_TYPES]
+
+    def flush(self):
+        if not self.header_written:
+            self.writer.writerow(self.columns)
+            self.header_written = True
+        self.writer.writerows(self.chunk)
+        self.count += len(self.chunk)
+        self.chunk = []
+
+    def close(self, commit=True):
+        """
+        Ferme le fichier temporaire et, si `commit`, remplace le CSV par son contenu.
+        Sans ligne écrite, le CSV existant est conservé.
+        """
+        try:
+            if commit and self.chunk:
+                self.flush()
+            self.file.close()
+            if not commit or not self.count:
+                return
+            float_columns = self.float_columns()
+            if not self.header_complete or float_columns:
+                rewrite_csv(self.tmp_file, self.csv_file + '.rewrite', self.columns, float_columns)
+                os.replace(self.csv_file + '.rewrite', self.tmp_file)
+            os.replace(self.tmp_file, self.csv_file)
+        finally:
+            self.file.close()
+            for path in (self.tmp_file, self.csv_file + '.rewrite'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+def run_conversion(input_json, indicators_csv, anomalies_csv, chunk_size=CHUNK_SIZE):
+    """
+    Convertit le fichier d'analyse en deux CSV en un seul passage : la mémoire utilisée
+    ne dépend que de la taille des paquets de lignes, pas de celle du fichier.
+    """
+    print("Conversion en flux du fichier JSON...")
+    outputs = {'indicators': indicators_csv, 'anomalies': anomalies_csv}
+    labels = {'indicators': "indicateurs", 'anomalies': "anomalies"}
+    empty = {'indicators': "Aucun indicateur à sauvegarder.", 'anomalies': "Aucune anomalie à sauvegarder."}
+    writers = {}
+    completed = False
+    try:
+        for kind in RECORD_KINDS:
+            writers[kind] = CsvChunkWriter(outputs[kind], chunk_size)
+        for ticker, kind, record in iter_records(input_json):
+            if kind == 'indicators':
+                record.pop('date', None)  # Supprimer la colonne 'date' pour éviter la duplication
+            record['ticker'] = ticker  # Ajouter le ticker pour référence
+            writers[kind].write(record)
+        completed = True
+    except FileNotFoundError:
+        print(f"Erreur : Le fichier {input_json} n'a pas été trouvé.")
+        return
+    except ijson.JSONError as e:
+        print(f"Erreur : Le fichier {input_json} n'est pas un JSON valide. {e}")
+        return
+    except Exception as e:
+        print(f"Erreur lors de la conversion : {e}")
+        return
+    finally:
+        # Les CSV existants ne sont remplacés que si tout le fichier a été lu
+        for writer in writers.values():
+            writer.close(commit=completed)
+
+    for kind in RECORD_KINDS:
+        if writers[kind].count:
+            print(f"Les {labels[kind]} ont été sauvegardés avec succès dans {outputs[kind]} ({writers[kind].count} lignes).")
+        else:
+            print(empty[kind])
+    print("Conversion terminée.")
+
+if __name__ == "__main__":
+    # Chemin vers le fichier JSON d'entrée
+    input_json_file = "analysis_output.json"
+    # Chemins vers les fichiers CSV de sortie
+    indicators_csv_file = "indicators.csv"
+    anomalies_csv_file = "anomalies.csv"
+    run_conversion(input_json_file, indicators_csv_file, anomalies_csv_file)
@@ -0,0 +1,92 @@
+import os
+import json
+
+import numpy as np
+
+ARTIFACT_NAME = 'forecaster'
+
+
+def _load_interpreter(model_path, num_threads):
+    """
+    Charge l'interpréteur TFLite le plus léger disponible : LiteRT ou tflite-runtime
+    si installés, TensorFlow sinon.
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+class ForecastPredictor:
+    """
+    Prédicteur CPU minimal pour un artefact produit par `export_model.py`.
+    N'importe ni Keras ni scikit-learn : la normalisation est refaite en numpy
+    à partir des paramètres du scaler enregistrés avec le modèle.
+    """
+
+    def __init__(self, artifact_dir, num_threads=1):
+        with open(os.path.join(artifact_dir, f'{ARTIFACT_NAME}.json'), 'r', encoding='utf-8') as file:
+            self.metadata = json.load(file)
+        self.window_size = self.metadata['window_size']
+        self.feature_columns = self.metadata['feature_columns']
+        self.scaler_min = np.asarray(self.metadata['scaler_min'], dtype=np.float32)
+        self.scaler_scale = np.asarray(self.metadata['scaler_scale'], dtype=np.float32)
+
+        if self.metadata['format'] == 'tflite':
+            self.interpreter = _load_interpreter(os.path.join(artifact_dir, f'{ARTIFACT_NAME}.tflite'), num_threads)
+            self.interpreter.allocate_tensors()
+            self.input_index = self.interpreter.get_input_details()[0]['index']
+            self.output_index = self.interpreter.get_output_details()[0]['index']
+            self._predict_scaled = self._predict_tflite
+        else:
+            import tensorflow as tf
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+            except RuntimeError:
+                # TensorFlow déjà initialisé dans ce processus : on garde sa configuration
+                pass
+            self.signature = tf.saved_model.load(os.path.join(artifact_dir, ARTIFACT_NAME)).signatures['serving_default']
+            self._predict_scaled = lambda windows: self.signature(window=tf.constant(windows))['close'].numpy()
+
+    def _predict_tflite(self, windows):
+        # Le modèle TFLite est figé avec un lot de 1 : les fenêtres passent une à une
+        outputs = np.empty(len(windows), dtype=np.float32)
+        for i, window in enumerate(windows):
+            self.interpreter.set_tensor(self.input_index, window[np.newaxis])
+            self.interpreter.invoke()
+            outputs[i] = self.interpreter.get_tensor(self.output_index)[0, 0]
+        return outputs
+
+    def scale(self, features):
+        """
+        Applique la normalisation MinMax du modèle à des features brutes.
+        """
+        return np.asarray(features, dtype=np.float32) * self.scaler_scale + self.scaler_min
+
+    def predict(self, windows):
+        """
+        Prédit la prochaine clôture (en prix) pour une ou plusieurs fenêtres de
+        features brutes de forme (window_size, n_features) ou (n, window_size, n_features).
+        """
+        windows = self.scale(windows)
+        single = windows.ndim == 2
+        if single:
+            windows = windows[np.newaxis]
+        scaled_close = self._predict_scaled(np.ascontiguousarray(windows)).ravel()
+        prices = (scaled_close - self.scaler_min[0]) / self.scaler_scale[0]
+        return prices[0] if single else prices
+
+
+if __name__ == "__main__":
+    import sys
+    import pandas as pd
+
+    # Usage : python forecast_predictor.py <dossier_export> <features.csv>
+    predictor = ForecastPredictor(sys.argv[1])
+    features = pd.read_csv(sys.argv[2])[predictor.feature_columns].dropna().to_numpy()
+    print(f"Prochaine clôture prédite: {predictor.predict(features[-predictor.window_size:]):.2f}")
@@ -0,0 +1,190 @@
+import os
+import json
+import random
+import itertools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from main import FEATURE_COLUMNS, get_spy_data, make_windows
+from walk_forward import init_worker
+
+SEARCH_SPACE = {
+    'units': [(100, 100, 50), (128, 64, 32), (64, 64, 32), (50, 50, 25)],
+    'dropout': [0.1, 0.2, 0.3, 0.4],
+    'window_size': [30, 60, 90],
+    'batch_size': [16, 32, 64],
+}
+
+
+def sample_configs(n_trials, seed=42):
+    """
+    Tire `n_trials` combinations distinctes de l'espace de recherche.
+    Le tirage est déterministe pour qu'une recherche reprise retrouve les mêmes essais.
+    """
+    keys = list(SEARCH_SPACE)
+    grid = list(itertools.product(*(SEARCH_SPACE[k] for k in keys)))
+    random.Random(seed).shuffle(grid)
+    return [dict(zip(keys, values)) for values in grid[:n_trials]]
+
+
+def check_search_metadata(search_dir, metadata):
+    """
+    Vérifie qu'une recherche reprise dans `search_dir` a les mêmes paramètres que
+    celle qui l'a commencée (dates, essais, graine, features...) : sinon ses features
+    et ses résultats en cache ne correspondent pas à la nouvelle recherche.
+    Enregistre les paramètres dans `search.json` au premier passage.
+    """
+    path = os.path.join(search_dir, 'search.json')
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            previous = json.load(file)
+        differences = [key for key in sorted(set(previous) | set(metadata)) if previous.get(key) != metadata.get(key)]
+        if differences:
+            raise ValueError(f"Le répertoire {search_dir} contient une recherche aux paramètres différents "
+                             f"({', '.join(differences)}) : utiliser un autre répertoire ou le vider.")
+        return
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(metadata, file, indent=4)
+
+
+def load_feature_cache(search_dir, start_date, end_date):
+    """
+    Calcule la matrice de features une seule fois et la met en cache dans `features.npy`.
+    Les essais la relisent en mémoire mappée au lieu de rappeler `get_spy_data`.
+    """
+    path = os.path.join(search_dir, 'features.npy')
+    if not os.path.exists(path):
+        spy_data = get_spy_data(start_date, end_date).dropna()
+        np.save(path, spy_data[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+    else:
+        print(f"Features chargées depuis le cache {path}")
+    return path
+
+
+def load_results(results_file):
+    """
+    Relit le journal des essais déjà évalués, indexé par (essai, palier).
+    """
+    results = {}
+    if os.path.exists(results_file):
+        with open(results_file, 'r', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    results[(record['trial'], record['rung'])] = record
+    return results
+
+
+def train_trial(trial_id, params, initial_epoch, epochs, features_path, val_size, checkpoint_path):
+    """
+    Entraîne un essai jusqu'à `epochs` en reprenant le modèle du palier précédent,
+    et retourne la meilleure perte de validation. Le point de reprise est le modèle
+    complet (poids et état de l'optimiseur Adam) : un essai repris continue comme
+    s'il n'avait pas été interrompu.
+    """
+    import tensorflow as tf
+    from sklearn.preprocessing import MinMaxScaler
+    from tensorflow.keras.callbacks import EarlyStopping
+    from main import build_lstm_model
+
+    tf.keras.utils.set_random_seed(trial_id)
+    features = np.load(features_path, mmap_mode='r')
+    window_size = params['window_size']
+    split = len(features) - val_size
+
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(features[:split])
+    scaled = scaler.transform(features)
+
+    X = make_windows(scaled, window_size)
+    y = scaled[window_size:, 0]
+    X_train, y_train = X[:split - window_size], y[:split - window_size]
+    X_val, y_val = X[split - window_size:], y[split - window_size:]
+
+    if initial_epoch > 0 and os.path.exists(checkpoint_path):
+        model = tf.keras.models.load_model(checkpoint_path)
+    else:
+        model = build_lstm_model((window_size, X.shape[2]), units=params['units'], dropout=params['dropout'])
+
+    early_stopping = EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
+    history = model.fit(X_train, y_train, validation_data=(X_val, y_val),
+                        initial_epoch=initial_epoch, epochs=epochs,
+                        batch_size=params['batch_size'], callbacks=[early_stopping], verbose=0)
+    model.save(checkpoint_path)
+
+    val_loss = float(min(history.history['val_loss']))
+    return {
+        'val_loss': val_loss,
+        'val_rmse': float(np.sqrt(val_loss) / scaler.scale_[0]),
+        'epochs_run': len(history.history['val_loss']),
+    }
+
+
+def run_search(start_date, end_date, search_dir='hyperparameter_search', n_trials=27,
+               min_epochs=5, max_epochs=135, eta=3, val_size=120, max_workers=None, seed=42):
+    """
+    Recherche par successive halving : à chaque palier, tous les essais survivants
+    sont entraînés en parallèle puis seul le meilleur tiers (1/eta) continue avec
+    un budget d'epochs multiplié par eta. Les résultats sont journalisés dans
+    `trials.jsonl` pour pouvoir reprendre une recherche interrompue ; une reprise
+    avec d'autres paramètres (voir `search.json`) est refusée.
+    """
+    os.makedirs(search_dir, exist_ok=True)
+    check_search_metadata(search_dir, {
+        'start_date': start_date, 'end_date': end_date, 'feature_columns': list(FEATURE_COLUMNS),
+        'n_trials': n_trials, 'seed': seed, 'min_epochs': min_epochs, 'max_epochs': max_epochs,
+        'eta': eta, 'val_size': val_size,
+    })
+    features_path = load_feature_cache(search_dir, start_date, end_date)
+    results_file = os.path.join(search_dir, 'trials.jsonl')
+    results = load_results(results_file)
+    configs = sample_configs(n_trials, seed)
+
+    cpu_count = os.cpu_count() or 1
+    max_workers = max_workers or min(n_trials, cpu_count)
+    threads = max(1, cpu_count // max_workers)
+    context = mp.get_context('spawn')
+
+    survivors = list(range(len(configs)))
+    initial_epoch, epochs, rung = 0, min_epochs, 0
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=init_worker, initargs=(threads,)) as executor:
+        while True:
+            pending = [t for t in survivors if (t, rung) not in results]
+            print(f"Palier {rung}: {len(survivors)} essais à {epochs} epochs "
+                  f"({len(survivors) - len(pending)} déjà évalués)")
+
+            futures = {
+                executor.submit(train_trial, t, configs[t], initial_epoch, epochs, features_path, val_size,
+                                os.path.join(search_dir, f'trial_{t:03d}.keras')): t
+                for t in pending
+            }
+            with open(results_file, 'a', encoding='utf-8') as log:
+                for future in as_completed(futures):
+                    t = futures[future]
+                    record = {'trial': t, 'rung': rung, 'epochs': epochs,
+                              'params': configs[t], **future.result()}
+                    results[(t, rung)] = record
+                    log.write(json.dumps(record) + '\n')
+                    log.flush()
+                    print(f"Essai {t} palier {rung}: val_loss={record['val_loss']:.6f}")
+
+            if len(survivors) <= 1 or epochs >= max_epochs:
+                break
+            survivors.sort(key=lambda t: results[(t, rung)]['val_loss'])
+            survivors = survivors[:max(1, len(survivors) // eta)]
+            initial_epoch, epochs, rung = epochs, min(epochs * eta, max_epochs), rung + 1
+
+    report = pd.DataFrame(results.values()).sort_values(['rung', 'val_loss'], ascending=[False, True])
+    return report.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    start_date = '2015-01-01'
+    end_date = '2024-01-01'
+    report = run_search(start_date, end_date)
+    print("Résultats de la recherche d'hyperparamètres:")
+    print(report[['trial', 'rung', 'epochs', 'params', 'val_loss', 'val_rmse']].head(10).to_string(index=False))
@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
 import yfinance as yf
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, LSTM, Dropout
-from tensorflow.keras.callbacks import EarlyStopping
+
+# scikit-learn et TensorFlow sont importés dans les fonctions qui en ont besoin :
+# get_spy_data et les indicateurs restent utilisables sans charger TensorFlow.
+
+FEATURE_COLUMNS = ['Close', 'MA_10', 'MA_20', 'RSI', 'MACD', 'Signal_Line', 'Upper_Band', 'Lower_Band']
 
 def get_spy_data(start_date, end_date):
     print("Récupération des données historiques de l'ETF SPY...")
@@ -31,33 +32,54 @@ def get_spy_data(start_date, end_date):
     spy['Upper_Band'] = spy['Close'].rolling(window=20).mean() + (spy['Stddev'] * 2)
     spy['Lower_Band'] = spy['Close'].rolling(window=20).mean() - (spy['Stddev'] * 2)
 
-    return spy[['Date', 'Close', 'MA_10', 'MA_20', 'RSI', 'MACD', 'Signal_Line', 'Upper_Band', 'Lower_Band']]
+    return spy[['Date'] + FEATURE_COLUMNS]
+
+def make_windows(data, window_size=60, out=None):
+    """
+    Retourne les fenêtres glissantes X[i] = data[i:i + window_size] (i < len(data) - window_size)
+    comme une vue en lecture seule sur un tableau float32 contigu, sans copie.
+    Si `out` est fourni (tableau préalloué de forme (n, window_size, n_features)),
+    les fenêtres y sont copiées pour les consommateurs qui doivent posséder leur mémoire.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    n_windows = len(data) - window_size
+    windows = np.lib.stride_tricks.as_strided(
+        data,
+        shape=(max(n_windows, 0), window_size, data.shape[1]),
+        strides=(data.strides[0], data.strides[0], data.strides[1]),
+        writeable=False,
+    )
+    if out is not None:
+        np.copyto(out, windows)
+        return out
+    return windows
 
 def prepare_data(df, window_size=60):
+    from sklearn.preprocessing import MinMaxScaler
+
     print("Préparation des données pour LSTM...")
     scaler = MinMaxScaler(feature_range=(0, 1))
-    df_scaled = scaler.fit_transform(df[['Close', 'MA_10', 'MA_20', 'RSI', 'MACD', 'Signal_Line', 'Upper_Band', 'Lower_Band']])
+    df_scaled = scaler.fit_transform(df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
 
-    X, y = [], []
-    for i in range(window_size, len(df_scaled)):
-        X.append(df_scaled[i-window_size:i])
-        y.append(df_scaled[i, 0])
-    
-    X, y = np.array(X), np.array(y)
+    X = make_windows(df_scaled, window_size)
+    y = df_scaled[window_size:, 0]
     return X, y, scaler
 
-def build_lstm_model(input_shape):
+def build_lstm_model(input_shape, units=(100, 100, 50), dropout=0.3):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, LSTM, Dropout
+
     print("Construction du modèle LSTM optimisé...")
     model = Sequential()
 
-    model.add(LSTM(units=100, return_sequences=True, input_shape=input_shape))
-    model.add(Dropout(0.3))
+    model.add(LSTM(units=units[0], return_sequences=True, input_shape=input_shape))
+    model.add(Dropout(dropout))
 
-    model.add(LSTM(units=100, return_sequences=True))
-    model.add(Dropout(0.3))
+    model.add(LSTM(units=units[1], return_sequences=True))
+    model.add(Dropout(dropout))
 
-    model.add(LSTM(units=50, return_sequences=False))
-    model.add(Dropout(0.3))
+    model.add(LSTM(units=units[2], return_sequences=False))
+    model.add(Dropout(dropout))
 
     model.add(Dense(units=25))
     model.add(Dense(units=1))
@@ -65,34 +87,183 @@ def build_lstm_model(input_shape):
     model.compile(optimizer='adam', loss='mean_squared_error')
     return model
 
+class RollingForecastState:
+    """
+    État d'une prévision autorégressive pour un lot de B séries.
+    La fenêtre normalisée est un tampon circulaire doublé (chaque ligne est écrite
+    en i et i + window_size) : la fenêtre ordonnée de chaque série est toujours la vue
+    buffer[:, head:head + window_size]. Les indicateurs de FEATURE_COLUMNS sont
+    mis à jour à partir de la clôture prédite avec des sommes glissantes et des
+    EMA, en O(features) par pas et sans réallocation.
+    """
+
+    def __init__(self, histories, scaler_min, scaler_scale, window_size=60):
+        self.window_size = window_size
+        shape = (len(histories), len(FEATURE_COLUMNS))
+        self.scaler_min = np.broadcast_to(np.asarray(scaler_min, dtype=np.float64), shape).copy()
+        self.scaler_scale = np.broadcast_to(np.asarray(scaler_scale, dtype=np.float64), shape).copy()
+
+        closes = [np.asarray(h, dtype=np.float64)[:, 0] for h in histories]
+        last = np.stack([c[-20:] for c in closes])
+
+        # Clôtures des 20 derniers jours (MA_10, MA_20, Bollinger) ; pos = plus ancienne
+        self.closes = last.copy()
+        self.pos = 0
+        self.sum10 = last[:, -10:].sum(axis=1)
+        self.sum20 = last.sum(axis=1)
+        self.sumsq20 = (last ** 2).sum(axis=1)
+
+        # Gains et pertes des 14 dernières variations (RSI)
+        deltas = np.diff(last[:, -15:], axis=1)
+        self.gains = np.maximum(deltas, 0)
+        self.losses = np.maximum(-deltas, 0)
+        self.delta_pos = 0
+        self.gain_sum = self.gains.sum(axis=1)
+        self.loss_sum = self.losses.sum(axis=1)
+
+        # EMA du MACD reprises sur tout l'historique, comme dans get_spy_data
+        self.ema12, self.ema26, self.signal = np.array([self._ema_state(c) for c in closes]).T
+
+        windows = np.stack([
+            np.asarray(h, dtype=np.float64)[-window_size:] * self.scaler_scale[i] + self.scaler_min[i]
+            for i, h in enumerate(histories)
+        ])
+        self.buffer = np.empty((len(histories), 2 * window_size, windows.shape[2]), dtype=np.float32)
+        self.buffer[:, :window_size] = windows
+        self.buffer[:, window_size:] = windows
+        self.head = 0
+
+    @staticmethod
+    def _ema_state(close):
+        close = pd.Series(close)
+        ema12 = close.ewm(span=12, adjust=False).mean()
+        ema26 = close.ewm(span=26, adjust=False).mean()
+        signal = (ema12 - ema26).ewm(span=9, adjust=False).mean()
+        return ema12.iloc[-1], ema26.iloc[-1], signal.iloc[-1]
+
+    def repeat(self, n):
+        """
+        Duplique chaque série n fois (lot de n * B), ex. pour des tirages Monte-Carlo.
+        """
+        state = object.__new__(RollingForecastState)
+        state.__dict__.update(self.__dict__)
+        for name, value in self.__dict__.items():
+            if isinstance(value, np.ndarray):
+                setattr(state, name, np.tile(value, (n,) + (1,) * (value.ndim - 1)))
+        return state
+
+    @property
+    def window(self):
+        return self.buffer[:, self.head:self.head + self.window_size]
+
+    def step(self, predicted_scaled_close):
+        """
+        Ajoute la clôture prédite (normalisée) à chaque série et retourne les clôtures en prix.
+        """
+        close = (np.asarray(predicted_scaled_close, dtype=np.float64) - self.scaler_min[:, 0]) / self.scaler_scale[:, 0]
+        previous = self.closes[:, (self.pos - 1) % 20]
+
+        leaving20 = self.closes[:, self.pos]
+        leaving10 = self.closes[:, (self.pos + 10) % 20]
+        self.sum20 += close - leaving20
+        self.sumsq20 += close ** 2 - leaving20 ** 2
+        self.sum10 += close - leaving10
+        self.closes[:, self.pos] = close
+        self.pos = (self.pos + 1) % 20
+
+        delta = close - previous
+        gain, loss = np.maximum(delta, 0), np.maximum(-delta, 0)
+        self.gain_sum += gain - self.gains[:, self.delta_pos]
+        self.loss_sum += loss - self.losses[:, self.delta_pos]
+        self.gains[:, self.delta_pos] = gain
+        self.losses[:, self.delta_pos] = loss
+        self.delta_pos = (self.delta_pos + 1) % 14
+
+        self.ema12 += (2 / 13) * (close - self.ema12)
+        self.ema26 += (2 / 27) * (close - self.ema26)
+        macd = self.ema12 - self.ema26
+        self.signal += (2 / 10) * (macd - self.signal)
+
+        ma20 = self.sum20 / 20
+        stddev = np.sqrt(np.maximum(self.sumsq20 - self.sum20 ** 2 / 20, 0) / 19)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + self.gain_sum / self.loss_sum))
+
+        row = np.stack([close, self.sum10 / 10, ma20, rsi, macd, self.signal,
+                        ma20 + 2 * stddev, ma20 - 2 * stddev], axis=1)
+        scaled = row * self.scaler_scale + self.scaler_min
+        self.buffer[:, self.head] = scaled
+        self.buffer[:, self.head + self.window_size] = scaled
+        self.head = (self.head + 1) % self.window_size
+        return close
+
 def predict_future(model, df, scaler, window_size=60, days_ahead=30):
     print(f"Prédiction pour les {days_ahead} jours à venir...")
     future_prices = []
-    
-    last_window = df[-window_size:]
-    scaled_window = scaler.transform(last_window)
-    
+
+    state = RollingForecastState([df[FEATURE_COLUMNS].to_numpy()], scaler.min_, scaler.scale_, window_size)
     for _ in range(days_ahead):
-        scaled_window = np.array(scaled_window).reshape(1, -1, 8)  # 8 features
-        predicted_price = model.predict(scaled_window)
-        future_prices.append(predicted_price[0][0])
-        
-        scaled_window = np.append(scaled_window[0, 1:, :], predicted_price)
-    
-    future_prices = scaler.inverse_transform(np.array(future_prices).reshape(-1, 1))
-    return future_prices
+        predicted_price = model(state.window, training=False).numpy()[:, 0]
+        future_prices.append(state.step(predicted_price)[0])
+
+    return np.array(future_prices).reshape(-1, 1)
+
+def predict_future_uncertainty(model, frames, scalers, window_size=60, days_ahead=30,
+                               n_samples=100, quantiles=(0.05, 0.5, 0.95)):
+    """
+    Prévision Monte-Carlo dropout : les Dropout restent actifs (training=True) et
+    les n_samples trajectoires de tous les tickers avancent ensemble dans un seul
+    lot de forme (n_samples * n_tickers, window_size, n_features) à chaque jour.
+    `frames` : {ticker: DataFrame des FEATURE_COLUMNS}, `scalers` : un scaler
+    commun ou {ticker: scaler}. Retourne {ticker: DataFrame des quantiles par jour}.
+    """
+    import tensorflow as tf
+
+    tickers = list(frames)
+    if not isinstance(scalers, dict):
+        scalers = {ticker: scalers for ticker in tickers}
+    print(f"Prédiction Monte-Carlo ({n_samples} tirages) pour {len(tickers)} tickers sur {days_ahead} jours...")
+
+    state = RollingForecastState(
+        [frames[t][FEATURE_COLUMNS].to_numpy() for t in tickers],
+        np.stack([scalers[t].min_ for t in tickers]),
+        np.stack([scalers[t].scale_ for t in tickers]),
+        window_size,
+    ).repeat(n_samples)
+    forward = tf.function(lambda x: model(x, training=True), reduce_retracing=True)
+
+    paths = np.empty((n_samples * len(tickers), days_ahead))
+    for step in range(days_ahead):
+        predicted = forward(tf.constant(state.window)).numpy()[:, 0]
+        paths[:, step] = state.step(predicted)
+
+    bands = np.quantile(paths.reshape(n_samples, len(tickers), days_ahead), quantiles, axis=0)
+
+    results = {}
+    for i, ticker in enumerate(tickers):
+        results[ticker] = pd.DataFrame(
+            bands[:, i, :].T, columns=[f"q{int(round(q * 100)):02d}" for q in quantiles],
+            index=pd.RangeIndex(1, days_ahead + 1, name='day'),
+        )
+    return results
+
+def train_model(spy_data, window_size=60, epochs=150, batch_size=32):
+    from tensorflow.keras.callbacks import EarlyStopping
 
-def train_and_evaluate_model(start_date, end_date):
-    spy_data = get_spy_data(start_date, end_date)
-    
-    window_size = 60
     X_train, y_train, scaler = prepare_data(spy_data, window_size)
     model = build_lstm_model((X_train.shape[1], X_train.shape[2]))
     early_stopping = EarlyStopping(monitor='loss', patience=10, restore_best_weights=True)
     
     print("Entraînement du modèle LSTM avec des epochs supplémentaires...")
-    model.fit(X_train, y_train, epochs=150, batch_size=32, callbacks=[early_stopping])
-    future_prices = predict_future(model, spy_data[['Close', 'MA_10', 'MA_20', 'RSI', 'MACD', 'Signal_Line', 'Upper_Band', 'Lower_Band']], scaler)
+    model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, callbacks=[early_stopping])
+    return model, scaler
+
+def train_and_evaluate_model(start_date, end_date):
+    spy_data = get_spy_data(start_date, end_date)
+    
+    window_size = 60
+    model, scaler = train_model(spy_data, window_size)
+    future_prices = predict_future(model, spy_data[FEATURE_COLUMNS], scaler)
     return future_prices
 
 if __name__ == "__main__":
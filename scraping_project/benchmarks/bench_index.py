@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+from src.scraper.article_index import ETF_TICKERS, MARKET_TIMEZONE, ArticleIndex
+from bench_store import sample_articles
+
+
+if __name__ == "__main__":
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+    tickers = sorted(ETF_TICKERS)
+    now = datetime.now(MARKET_TIMEZONE)
+    articles = sample_articles(n_articles, syndication=0)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        index = ArticleIndex(os.path.join(workdir, 'articles.sqlite'), commit_every=1000)
+        started = time.perf_counter()
+        for article in articles:
+            # Un article sur trois cite un ou deux ETFs ; dates réparties sur un an
+            if rng.random() < 1 / 3:
+                article['contenu'] += '\n' + ' '.join(f'(NYSEARCA:{t})' for t in rng.sample(tickers, rng.randint(1, 2)))
+            index.add(article, now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)))
+        index.commit()
+        index_time = time.perf_counter() - started
+
+        week_ago = now - timedelta(days=7)
+        repeats = 1000
+        started = time.perf_counter()
+        for _ in range(repeats):
+            rows = index.mentions('QQQ', start=week_ago)
+        mentions_time = (time.perf_counter() - started) / repeats
+
+        started = time.perf_counter()
+        for _ in range(100):
+            hits = index.search('bankruptcy OR airline', ticker='QQQ', start=week_ago)
+        search_time = (time.perf_counter() - started) / 100
+        index.close()
+
+    print(f"{n_articles} articles indexés en {index_time:.2f} s ({n_articles / index_time:,.0f} articles/s)")
+    print(f"Articles citant QQQ sur 7 jours : {len(rows):4d} résultats en {mentions_time * 1e3:.3f} ms")
+    print(f"Recherche 'bankruptcy OR airline' + QQQ sur 7 jours : {len(hits):4d} résultats en {search_time * 1e3:.3f} ms")
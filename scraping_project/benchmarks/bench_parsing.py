@@ -0,0 +1,78 @@
+import os
+import sys
+import glob
+import json
+import time
+
+from bs4 import BeautifulSoup
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+from src.scraper import parsing
+
+ARTICLES_FILE = os.path.join(PROJECT_DIR, 'tests', 'seekingalpha-bf4', 'articles_with_content.json')
+
+# Gabarit d'une page d'article : le bloc utile est noyé dans la navigation et les scripts
+PAGE_TEMPLATE = """<html><head><title>{title}</title>{scripts}</head><body>
+<nav>{nav}</nav><div class="layout"><aside>{aside}</aside>
+<article><h1>{title}</h1><div class="paywall-full-content">{paragraphs}</div></article>
+<section class="comments">{aside}</section></div></body></html>"""
+
+
+def sample_pages(pages_dir=None):
+    """
+    Retourne les pages HTML enregistrées dans `pages_dir`, ou à défaut des pages
+    reconstruites à partir des articles enregistrés par le scraper.
+    """
+    if pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+            with open(path, 'rb') as file:
+                pages.append(file.read())
+        return pages
+
+    with open(ARTICLES_FILE, 'r', encoding='utf-8') as file:
+        articles = json.load(file)
+    nav = ''.join(f'<li><a href="/symbol/T{i}">Ticker {i}</a></li>' for i in range(300))
+    aside = ''.join(f'<div class="card"><span>Card {i}</span><p>Lorem ipsum dolor sit amet</p></div>' for i in range(200))
+    scripts = ''.join(f'<script>window.__data_{i} = {{"k": {i}}};</script>' for i in range(50))
+    return [
+        PAGE_TEMPLATE.format(
+            title=article['titre'], nav=nav, aside=aside, scripts=scripts,
+            paragraphs=''.join(f'<p>{line}</p>' for line in article['contenu'].split('\n')),
+        ).encode('utf-8')
+        for article in articles
+    ]
+
+
+def old_parse(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    content_div = soup.find('div', class_='paywall-full-content')
+    return content_div.get_text(separator='\n', strip=True) if content_div else None
+
+
+def strainer_parse(page):
+    return parsing._parse_article_content_bs4(page)
+
+
+VARIANTS = {
+    "BeautifulSoup html.parser (ancien)": old_parse,
+    "BeautifulSoup + SoupStrainer": strainer_parse,
+    "lxml + XPath compilé": parsing.parse_article_content,
+}
+
+
+if __name__ == "__main__":
+    pages = sample_pages(sys.argv[1] if len(sys.argv) > 1 else None)
+    size_mb = sum(len(page) for page in pages) / 2**20
+    print(f"{len(pages)} pages, {size_mb:.1f} Mo")
+
+    reference = [old_parse(page) for page in pages]
+    baseline = None
+    for name, parse in VARIANTS.items():
+        started = time.perf_counter()
+        results = [parse(page) for page in pages]
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        identical = sum(r == ref for r, ref in zip(results, reference))
+        print(f"{name:36} {elapsed:8.3f} s  x{baseline / elapsed:5.1f}  ({identical}/{len(pages)} identiques)")
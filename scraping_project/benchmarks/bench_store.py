@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+from src.scraper.article_store import ArticleStore
+
+ARTICLES_FILE = os.path.join(PROJECT_DIR, 'tests', 'seekingalpha-bf4', 'articles_with_content.json')
+
+
+def sample_articles(n_articles=5000, syndication=0.2, seed=0):
+    """
+    Corpus synthétique construit à partir des articles enregistrés : des phrases
+    recombinées, et une part d'articles repris à l'identique sous une autre URL.
+    """
+    with open(ARTICLES_FILE, 'r', encoding='utf-8') as file:
+        lines = [line for article in json.load(file) for line in article['contenu'].split('\n')]
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n_articles):
+        if articles and rng.random() < syndication:
+            source = rng.choice(articles)
+            articles.append({'titre': source['titre'], 'url': f'https://seekingalpha.com/news/{i}-repris', 'contenu': source['contenu']})
+            continue
+        body = '\n'.join(rng.choice(lines) for _ in range(rng.randint(20, 80)))
+        articles.append({'titre': f'Article {i}', 'url': f'https://seekingalpha.com/news/{i}', 'contenu': body})
+    return articles
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+if __name__ == "__main__":
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    articles = sample_articles(n_articles)
+    workdir = tempfile.mkdtemp()
+    try:
+        json_file = os.path.join(workdir, 'articles_with_content.json')
+        started = time.perf_counter()
+        with open(json_file, 'w', encoding='utf-8') as file:
+            json.dump(articles, file, ensure_ascii=False, indent=4)
+        json_time = time.perf_counter() - started
+        json_size = os.path.getsize(json_file)
+
+        store_dir = os.path.join(workdir, 'store')
+        started = time.perf_counter()
+        store = ArticleStore(store_dir)
+        for article in articles:
+            store.write(article)
+        store.close()
+        store_time = time.perf_counter() - started
+        store_size = directory_size(store_dir)
+
+        store = ArticleStore(store_dir)
+        sample = random.Random(1).sample(articles, 1000)
+        started = time.perf_counter()
+        stored = [store.get(article['url']) for article in sample]
+        lookup_time = (time.perf_counter() - started) / len(sample)
+        identical = sum(found['contenu'] == article['contenu'] for found, article in zip(stored, sample))
+        store.close()
+
+        print(f"{n_articles} articles")
+        print(f"JSON indent=4      {json_size / 2**20:8.2f} Mo  écriture {json_time:6.2f} s")
+        print(f"Stockage zstd      {store_size / 2**20:8.2f} Mo  écriture {store_time:6.2f} s  x{json_size / store_size:4.1f} plus petit")
+        print(f"Lecture par URL    {lookup_time * 1e6:8.1f} µs  ({identical}/{len(sample)} identiques)")
+    finally:
+        shutil.rmtree(workdir)
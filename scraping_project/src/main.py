@@ -0,0 +1,49 @@
+import os
+import asyncio
+import argparse
+
+from .scraper.article_index import ArticleIndex
+from .scraper.article_store import ArticleStore
+from .scraper.backends import BACKENDS
+from .scraper.scraper import BASE_URL, JsonArticleSink, MultiSink, scrape
+from .utils.helpers import setup_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape les nouveaux articles de Seeking Alpha.")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='async')
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--output', default='articles_with_content.json')
+    parser.add_argument('--index', default='seen_urls.json')
+    parser.add_argument('--store', help="répertoire du stockage compressé (remplace le fichier JSON)")
+    parser.add_argument('--search-index', help="fichier SQLite de l'index plein texte à alimenter")
+    parser.add_argument('--rate', type=float, default=1.0, help="requêtes par seconde et par hôte")
+    parser.add_argument('--concurrency', type=int, default=4, help="requêtes simultanées (navigateurs pour selenium)")
+    parser.add_argument('--log-file', default='scraping_seekingalpha.log')
+    args = parser.parse_args()
+
+    setup_logging(args.log_file)
+    backend = BACKENDS[args.backend](rate=args.rate, concurrency=args.concurrency)
+    if args.store:
+        sink = ArticleStore(args.store)
+        if not len(sink) and os.path.exists(args.output):
+            # Premier passage avec le stockage : reprise des articles du fichier JSON
+            sink.import_json(args.output)
+    else:
+        sink = JsonArticleSink(args.output)
+
+    if args.search_index:
+        index = ArticleIndex(args.search_index)
+        if not len(index):
+            # Premier passage avec l'index : indexation des articles déjà enregistrés
+            if args.store:
+                index.index_store(sink)
+            else:
+                for article in sink.articles:
+                    index.add(article)
+        sink = MultiSink(sink, index)
+    asyncio.run(scrape(backend, args.output, args.index, args.base_url, fetch_workers=args.concurrency, sink=sink))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import re
+import sqlite3
+import logging
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from .seen_index import canonical_url
+
+# Même fuseau et même format de date que les ticks de dataset_bigquery/etf_market_data
+MARKET_TIMEZONE = ZoneInfo('America/New_York')
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# ETFs reconnus dans les articles (ceux suivis par etf_market_data en tête)
+ETF_TICKERS = frozenset([
+    'SPY', 'QQQ', 'EEM', 'IVV', 'VOO', 'VTI', 'DIA', 'IWM', 'EFA', 'VEA', 'VWO', 'AGG',
+    'BND', 'TLT', 'IEF', 'SHY', 'LQD', 'HYG', 'GLD', 'SLV', 'USO', 'UNG', 'XLK', 'XLF',
+    'XLE', 'XLV', 'XLI', 'XLY', 'XLP', 'XLU', 'XLB', 'XLRE', 'XLC', 'SMH', 'SOXX', 'ARKK',
+    'VNQ', 'EWJ', 'EWZ', 'FXI', 'KWEB', 'TQQQ', 'SQQQ', 'SPXL', 'SPXS', 'UVXY', 'VXX',
+    'SCHD', 'VIG', 'VYM', 'JEPI', 'IBIT', 'FBTC', 'GBTC', 'KRE', 'XBI', 'IBB', 'ITB',
+])
+
+# Symboles en majuscules isolés : "SPY", "(QQQ)", "NYSEARCA:EEM"
+_SYMBOL_PATTERN = re.compile(r'(?<![A-Za-z0-9])[A-Z]{2,5}(?![A-Za-z0-9])')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    titre TEXT,
+    datetime TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_datetime ON articles (datetime);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    titre, contenu, content='', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS article_tickers (
+    ticker TEXT NOT NULL,
+    datetime TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    PRIMARY KEY (ticker, datetime, article_id)
+) WITHOUT ROWID;
+"""
+
+
+def extract_tickers(text, universe=ETF_TICKERS):
+    """
+    Retourne les tickers d'ETF cités dans un texte, triés.
+    """
+    return sorted(set(_SYMBOL_PATTERN.findall(text)) & universe)
+
+
+def market_time(value):
+    """
+    Convertit une date (datetime, date ou chaîne) au format des ticks, heure de New York.
+    Les datetimes naïfs et les chaînes sont supposés être déjà à l'heure du marché.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(MARKET_TIMEZONE)
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d 00:00:00')
+    raise TypeError(f"Date non reconnue: {value!r}")
+
+
+class ArticleIndex:
+    """
+    Index plein texte (SQLite FTS5) des articles scrapés, alimenté au fil de l'eau.
+    Chaque article est daté à l'heure du marché et étiqueté avec les tickers d'ETF
+    qu'il cite ; la table (ticker, datetime, article) est une clé primaire sans rowid,
+    si bien que « les articles citant QQQ cette semaine » se lisent sur un seul
+    intervalle de l'index.
+
+    S'utilise aussi comme destination du pipeline de scraping (write / close).
+    """
+
+    def __init__(self, path, universe=ETF_TICKERS, commit_every=100, probe_limit=500):
+        self.path = path
+        self.probe_limit = probe_limit
+        self.universe = frozenset(universe)
+        self.commit_every = commit_every
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.added = 0
+        self.pending = 0
+
+    def __contains__(self, url):
+        return self.db.execute(
+            "SELECT 1 FROM articles WHERE url = ?", (canonical_url(url),)
+        ).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def add(self, article, fetched_at=None):
+        """
+        Indexe un article ({'titre', 'url', 'contenu'}) ; `fetched_at` est sa date de
+        récupération (maintenant par défaut). Retourne ses tickers, ou None s'il était déjà indexé.
+        """
+        url = canonical_url(article['url'])
+        if url in self:
+            return None
+        fetched_at = market_time(fetched_at or datetime.now(timezone.utc))
+        cursor = self.db.execute(
+            "INSERT INTO articles (url, titre, datetime) VALUES (?, ?, ?)", (url, article['titre'], fetched_at)
+        )
+        article_id = cursor.lastrowid
+        self.db.execute(
+            "INSERT INTO articles_fts (rowid, titre, contenu) VALUES (?, ?, ?)",
+            (article_id, article['titre'], article['contenu'])
+        )
+        tickers = extract_tickers(f"{article['titre']}\n{article['contenu']}", self.universe)
+        self.db.executemany(
+            "INSERT INTO article_tickers (ticker, datetime, article_id) VALUES (?, ?, ?)",
+            [(ticker, fetched_at, article_id) for ticker in tickers]
+        )
+        self.added += 1
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+        return tickers
+
+    def write(self, article):
+        self.add(article)
+
+    def index_store(self, store):
+        """
+        Indexe les articles d'un ArticleStore qui ne le sont pas encore, datés de leur stockage.
+        """
+        indexed = 0
+        for article, stored_at in store.records():
+            stored_at = datetime.strptime(stored_at, DATETIME_FORMAT).replace(tzinfo=timezone.utc)
+            indexed += self.add(article, stored_at) is not None
+        self.commit()
+        logging.info(f"{indexed} articles indexés depuis le stockage '{store.directory}'.")
+        return indexed
+
+    def commit(self):
+        self.db.commit()
+        self.pending = 0
+
+    def mentions(self, ticker, start=None, end=None):
+        """
+        Articles citant `ticker` entre `start` (inclus) et `end` (exclu), du plus ancien
+        au plus récent : liste de (datetime, url, titre).
+        """
+        return self.db.execute(
+            "SELECT t.datetime, a.url, a.titre FROM article_tickers t JOIN articles a ON a.id = t.article_id "
+            "WHERE t.ticker = ? AND t.datetime >= ? AND t.datetime < ? ORDER BY t.datetime",
+            (ticker, market_time(start) if start else '', market_time(end) if end else '9999')
+        ).fetchall()
+
+    def search(self, query, ticker=None, start=None, end=None, limit=50):
+        """
+        Recherche plein texte (syntaxe FTS5), éventuellement restreinte à un ticker et
+        à une période, par pertinence : liste de (datetime, url, titre).
+        """
+        period = [market_time(start) if start else '', market_time(end) if end else '9999']
+        if ticker:
+            candidates = ("SELECT article_id FROM article_tickers "
+                          "WHERE ticker = ? AND datetime >= ? AND datetime < ?")
+            params = [ticker] + period
+        else:
+            candidates = "SELECT id FROM articles WHERE datetime >= ? AND datetime < ?"
+            params = period
+        ids = [article_id for article_id, in self.db.execute(candidates, params)]
+
+        if len(ids) > self.probe_limit:
+            sql = ("SELECT a.datetime, a.url, a.titre FROM articles_fts f JOIN articles a ON a.id = f.rowid "
+                   f"WHERE articles_fts MATCH ? AND f.rowid IN ({candidates}) ORDER BY f.rank LIMIT ?")
+            return self.db.execute(sql, [query] + params + [limit]).fetchall()
+
+        # Peu de candidats (un ticker sur une semaine) : FTS5 est interrogé rowid par
+        # rowid au lieu de parcourir toutes les occurrences des termes recherchés.
+        scored = []
+        for article_id in ids:
+            row = self.db.execute(
+                "SELECT rank FROM articles_fts WHERE articles_fts MATCH ? AND rowid = ?", (query, article_id)
+            ).fetchone()
+            if row:
+                scored.append((row[0], article_id))
+        scored.sort()
+        return [
+            self.db.execute("SELECT datetime, url, titre FROM articles WHERE id = ?", (article_id,)).fetchone()
+            for _, article_id in scored[:limit]
+        ]
+
+    def mentions_frame(self, tickers, start=None, end=None):
+        """
+        Mentions de plusieurs tickers sous forme de DataFrame (ticker, datetime, url, titre),
+        prête à être jointe aux ticks d'etf_market_data.
+        """
+        rows = [(ticker,) + row for ticker in tickers for row in self.mentions(ticker, start, end)]
+        frame = pd.DataFrame(rows, columns=['ticker', 'datetime', 'url', 'titre'])
+        frame['datetime'] = pd.to_datetime(frame['datetime'])
+        return frame
+
+    def close(self):
+        self.commit()
+        if self.added:
+            logging.info(f"{self.added} articles ajoutés à l'index '{self.path}'.")
+        self.db.close()
+
+
+def join_ticks(mentions, ticks):
+    """
+    Associe à chaque mention le dernier tick connu de l'ETF au moment de l'article.
+    `ticks` suit le format des fichiers real_time_data_*.json d'etf_market_data.
+    """
+    ticks = ticks.assign(datetime=pd.to_datetime(ticks['datetime'])).sort_values('datetime')
+    return pd.merge_asof(mentions.sort_values('datetime'), ticks.drop(columns=['date'], errors='ignore'),
+                         on='datetime', by='ticker', direction='backward')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interroge l'index des articles scrapés.")
+    parser.add_argument('index', help="fichier SQLite de l'index")
+    parser.add_argument('--ticker', help="ETF cité, par exemple QQQ")
+    parser.add_argument('--query', help="recherche plein texte (syntaxe FTS5)")
+    parser.add_argument('--days', type=int, default=7, help="période remontant à N jours")
+    args = parser.parse_args()
+
+    index = ArticleIndex(args.index)
+    start = datetime.now(MARKET_TIMEZONE) - timedelta(days=args.days)
+    if args.query:
+        rows = index.search(args.query, ticker=args.ticker, start=start)
+    elif args.ticker:
+        rows = index.mentions(args.ticker, start=start)
+    else:
+        parser.error("--ticker ou --query est requis")
+    for when, url, titre in rows:
+        print(f"{when}  {titre}  {url}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import os
+import glob
+import sqlite3
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+import zstandard
+
+from .seen_index import canonical_url
+from ..utils.helpers import load_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    hash TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    dictionary INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    titre TEXT,
+    hash TEXT NOT NULL REFERENCES contents(hash),
+    stored_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dictionaries (
+    id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+
+class ArticleStore:
+    """
+    Stockage des articles adressé par contenu : chaque corps d'article est identifié
+    par son empreinte SHA-256 et écrit une seule fois, compressé en zstd, à la fin
+    d'un segment en ajout seul (segments/000000.zst, ...). Un index SQLite associe
+    les URLs à leur empreinte et les empreintes à leur position dans les segments.
+
+    Les articles repris sur plusieurs URLs ne sont stockés qu'une fois, et un ajout
+    ne réécrit jamais les données existantes.
+
+    Les corps sont courts : compressés un par un, ils gagnent peu. Dès que
+    `train_after` corps sont stockés, un dictionnaire zstd est entraîné sur eux
+    et utilisé pour les corps suivants (les trames déjà écrites restent telles quelles).
+
+    S'utilise aussi comme destination du pipeline de scraping (write / close).
+    """
+
+    def __init__(self, directory, segment_size=64 * 2**20, level=9, dict_size=32 * 2**10,
+                 train_after=1000, commit_every=100):
+        self.directory = directory
+        self.segments_dir = os.path.join(directory, 'segments')
+        os.makedirs(self.segments_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite'))
+        self.db.executescript(SCHEMA)
+        self.segment_size = segment_size
+        self.level = level
+        self.dict_size = dict_size
+        self.train_after = train_after
+        self.commit_every = commit_every
+        self.added = 0
+        self.pending = 0
+        self.readers = {}
+        self.decompressors = {}
+
+        row = self.db.execute("SELECT id, data FROM dictionaries ORDER BY id DESC LIMIT 1").fetchone()
+        self.dictionary_id = row[0] if row else 0
+        self.compressor = self._compressor(row[1] if row else None)
+
+        segments = sorted(glob.glob(os.path.join(self.segments_dir, '*.zst')))
+        self.segment_id = int(os.path.basename(segments[-1])[:-4]) if segments else 0
+        self._open_segment()
+
+    def _segment_path(self, segment_id):
+        return os.path.join(self.segments_dir, f'{segment_id:06d}.zst')
+
+    def _open_segment(self):
+        self.segment = open(self._segment_path(self.segment_id), 'ab')
+        # Des octets non indexés (écriture interrompue) peuvent rester en fin de
+        # segment : ils sont simplement ignorés, l'index fait foi.
+        self.offset = self.segment.tell()
+
+    def _compressor(self, dictionary_data):
+        if dictionary_data is None:
+            return zstandard.ZstdCompressor(level=self.level)
+        return zstandard.ZstdCompressor(level=self.level, dict_data=zstandard.ZstdCompressionDict(dictionary_data))
+
+    def _decompressor(self, dictionary_id):
+        if dictionary_id not in self.decompressors:
+            if dictionary_id:
+                data = self.db.execute("SELECT data FROM dictionaries WHERE id = ?", (dictionary_id,)).fetchone()[0]
+                self.decompressors[dictionary_id] = zstandard.ZstdDecompressor(
+                    dict_data=zstandard.ZstdCompressionDict(data))
+            else:
+                self.decompressors[dictionary_id] = zstandard.ZstdDecompressor()
+        return self.decompressors[dictionary_id]
+
+    def _train_dictionary(self):
+        """
+        Entraîne le dictionnaire zstd sur les corps déjà stockés.
+        """
+        rows = self.db.execute("SELECT hash FROM contents LIMIT ?", (self.train_after,)).fetchall()
+        samples = [self.read_content(digest) for digest, in rows]
+        try:
+            dictionary = zstandard.train_dictionary(self.dict_size, samples, level=self.level)
+        except zstandard.ZstdError as e:
+            logging.warning(f"Entraînement du dictionnaire zstd impossible: {e}")
+            self.train_after *= 2
+            return
+        cursor = self.db.execute("INSERT INTO dictionaries (data) VALUES (?)", (dictionary.as_bytes(),))
+        self.dictionary_id = cursor.lastrowid
+        self.compressor = self._compressor(dictionary.as_bytes())
+        logging.info(f"Dictionnaire zstd entraîné sur {len(samples)} articles.")
+
+    def _store_content(self, body):
+        """
+        Écrit un corps d'article s'il n'est pas déjà stocké. Retourne son empreinte.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        if self.db.execute("SELECT 1 FROM contents WHERE hash = ?", (digest,)).fetchone():
+            return digest
+
+        frame = self.compressor.compress(body)
+        if self.offset and self.offset + len(frame) > self.segment_size:
+            self.segment.close()
+            self.segment_id += 1
+            self._open_segment()
+        self.segment.write(frame)
+        self.db.execute(
+            "INSERT INTO contents (hash, segment, offset, length, dictionary) VALUES (?, ?, ?, ?, ?)",
+            (digest, self.segment_id, self.offset, len(frame), self.dictionary_id)
+        )
+        self.offset += len(frame)
+
+        if not self.dictionary_id and self.db.execute("SELECT COUNT(*) FROM contents").fetchone()[0] >= self.train_after:
+            self._train_dictionary()
+        return digest
+
+    def write(self, article):
+        """
+        Ajoute un article ({'titre', 'url', 'contenu'}). Une URL déjà présente est ignorée.
+        """
+        url = canonical_url(article['url'])
+        if url in self:
+            return False
+        digest = self._store_content(article['contenu'].encode('utf-8'))
+        self.db.execute(
+            "INSERT INTO articles (url, titre, hash, stored_at) VALUES (?, ?, ?, ?)",
+            (url, article['titre'], digest, datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))
+        )
+        self.added += 1
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+        return True
+
+    def commit(self):
+        # Les trames sont sur disque avant que l'index ne les référence
+        self.segment.flush()
+        os.fsync(self.segment.fileno())
+        self.db.commit()
+        self.pending = 0
+
+    def read_content(self, digest):
+        """
+        Retourne le corps (en octets) correspondant à une empreinte, ou None.
+        """
+        row = self.db.execute(
+            "SELECT segment, offset, length, dictionary FROM contents WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+        segment_id, offset, length, dictionary_id = row
+        if segment_id == self.segment_id:
+            self.segment.flush()
+        if segment_id not in self.readers:
+            self.readers[segment_id] = os.open(self._segment_path(segment_id), os.O_RDONLY)
+        frame = os.pread(self.readers[segment_id], length, offset)
+        return self._decompressor(dictionary_id).decompress(frame)
+
+    def get(self, url):
+        """
+        Retourne l'article enregistré pour une URL, ou None.
+        """
+        row = self.db.execute(
+            "SELECT url, titre, hash FROM articles WHERE url = ?", (canonical_url(url),)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'titre': row[1], 'url': row[0], 'contenu': self.read_content(row[2]).decode('utf-8')}
+
+    def __contains__(self, url):
+        return self.db.execute(
+            "SELECT 1 FROM articles WHERE url = ?", (canonical_url(url),)
+        ).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def __iter__(self):
+        for url, titre, digest in self.db.execute("SELECT url, titre, hash FROM articles ORDER BY rowid").fetchall():
+            yield {'titre': titre, 'url': url, 'contenu': self.read_content(digest).decode('utf-8')}
+
+    def records(self):
+        """
+        Parcourt les articles avec leur date de stockage (UTC) : couples (article, stored_at).
+        """
+        rows = self.db.execute("SELECT url, titre, hash, stored_at FROM articles ORDER BY rowid").fetchall()
+        for url, titre, digest, stored_at in rows:
+            yield {'titre': titre, 'url': url, 'contenu': self.read_content(digest).decode('utf-8')}, stored_at
+
+    def known_urls(self):
+        return [url for url, in self.db.execute("SELECT url FROM articles")]
+
+    def import_json(self, json_file):
+        """
+        Importe les articles d'un fichier JSON produit par l'ancien scraper.
+        """
+        imported = sum(self.write(article) for article in load_json(json_file, default=[]))
+        self.commit()
+        logging.info(f"{imported} articles importés depuis '{json_file}'.")
+        return imported
+
+    def close(self):
+        self.commit()
+        if self.added:
+            logging.info(f"{self.added} articles ajoutés au stockage '{self.directory}'.")
+        else:
+            logging.info("Aucun nouvel article à enregistrer.")
+        self.segment.close()
+        for fd in self.readers.values():
+            os.close(fd)
+        self.readers = {}
+        self.db.close()
@@ -0,0 +1,100 @@
+import time
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# En-têtes HTTP pour simuler un navigateur web
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.82 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+
+class TokenBucket:
+    """
+    Limiteur de débit à jetons : `rate` requêtes par seconde en régime permanent,
+    avec des rafales d'au plus `capacity` requêtes.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """
+    Un seau à jetons par hôte : chaque site a son propre débit poli.
+    """
+
+    def __init__(self, rate=1.0, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    async def acquire(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        await self.buckets[host].acquire()
+
+
+class AsyncFetcher:
+    """
+    Client HTTP asynchrone partagé : un pool de connexions unique, au plus
+    `per_host_limit` requêtes simultanées par hôte et un seau à jetons par hôte
+    à la place d'une pause fixe entre les requêtes.
+    """
+
+    def __init__(self, headers=None, rate=1.0, burst=1, per_host_limit=4, total_limit=100, timeout=10):
+        self.headers = headers or DEFAULT_HEADERS
+        self.limiter = HostRateLimiter(rate, burst)
+        self.per_host_limit = per_host_limit
+        self.total_limit = total_limit
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.total_limit, limit_per_host=self.per_host_limit)
+        self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def fetch(self, url, headers=None):
+        """
+        Récupère une URL en respectant le débit de son hôte.
+        Retourne (statut, en-têtes, contenu), ou None en cas d'erreur réseau.
+        """
+        await self.limiter.acquire(url)
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                return response.status, response.headers, await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"Exception lors de la requête {url}: {e}")
+            return None
+
+    async def fetch_all(self, urls):
+        """
+        Récupère toutes les URLs en parallèle ; les résultats suivent l'ordre de `urls`.
+        """
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+
+import requests
+
+from .async_fetcher import DEFAULT_HEADERS, AsyncFetcher, HostRateLimiter
+
+
+class FetchBackend:
+    """
+    Interface des backends de récupération utilisés par le pipeline.
+    `fetch` retourne (statut, en-têtes, contenu en octets) ou None en cas d'erreur ;
+    `wait_for` est le sélecteur CSS attendu par les backends qui rendent la page.
+    """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def fetch(self, url, headers=None, wait_for=None):
+        raise NotImplementedError
+
+
+class AsyncBackend(FetchBackend):
+    """
+    Backend aiohttp : pool de connexions partagé et débit limité par hôte.
+    """
+
+    def __init__(self, rate=1.0, burst=1, concurrency=4, timeout=10):
+        self.fetcher = AsyncFetcher(rate=rate, burst=burst, per_host_limit=concurrency, timeout=timeout)
+
+    async def __aenter__(self):
+        await self.fetcher.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.fetcher.__aexit__(*exc_info)
+
+    async def fetch(self, url, headers=None, wait_for=None):
+        return await self.fetcher.fetch(url, headers=headers)
+
+
+class RequestsBackend(FetchBackend):
+    """
+    Backend requests : une session partagée appelée depuis des threads,
+    avec au plus `concurrency` requêtes simultanées.
+    """
+
+    def __init__(self, rate=1.0, burst=1, concurrency=4, timeout=10):
+        self.limiter = HostRateLimiter(rate, burst)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.session.close()
+
+    async def fetch(self, url, headers=None, wait_for=None):
+        await self.limiter.acquire(url)
+        async with self.semaphore:
+            try:
+                response = await asyncio.to_thread(self.session.get, url, headers=headers, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Exception lors de la requête {url}: {e}")
+                return None
+        return response.status_code, response.headers, response.content
+
+
+class SeleniumBackend(FetchBackend):
+    """
+    Backend Selenium : pool de `concurrency` navigateurs sans tête, pour les pages
+    rendues en JavaScript.
+    """
+
+    def __init__(self, rate=1.0, burst=1, concurrency=3, timeout=15, block_resources=True):
+        # Import local : Selenium n'est nécessaire que pour ce backend
+        from .driver_pool import DriverPool
+        self.limiter = HostRateLimiter(rate, burst)
+        self.pool = DriverPool(size=concurrency, block_resources=block_resources, timeout=timeout)
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.to_thread(self.pool.close)
+
+    async def fetch(self, url, headers=None, wait_for=None):
+        await self.limiter.acquire(url)
+        page_source = await asyncio.to_thread(self.pool.fetch, url, wait_for or 'body')
+        if page_source is None:
+            return None
+        return 200, {}, page_source.encode('utf-8')
+
+
+BACKENDS = {
+    'async': AsyncBackend,
+    'requests': RequestsBackend,
+    'selenium': SeleniumBackend,
+}
@@ -0,0 +1,146 @@
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.82 Safari/537.36"
+
+# Ressources inutiles au scraping : images, polices, publicité et mesure d'audience
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*doubleclick.net*', '*googlesyndication.com*', '*google-analytics.com*',
+    '*googletagmanager.com*', '*adservice.google.com*', '*amazon-adsystem.com*',
+    '*facebook.net*', '*scorecardresearch.com*',
+]
+
+
+def setup_driver(block_resources=True):
+    """
+    Configure et retourne un WebDriver Chrome sans tête.
+    La page est rendue dès que le DOM est prêt (stratégie 'eager') et les
+    ressources de BLOCKED_URLS ne sont pas téléchargées.
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    chrome_options.page_load_strategy = 'eager'
+    if block_resources:
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+        })
+    driver = webdriver.Chrome(options=chrome_options)
+    if block_resources:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+    return driver
+
+
+class DriverPool:
+    """
+    Pool de N navigateurs réutilisables alimenté par une file de travail :
+    chaque page est chargée par le premier navigateur libre, et l'attente porte
+    sur la présence de l'élément utile plutôt que sur une pause fixe.
+    Un navigateur en erreur est fermé et sa place rendue au pool, qui en crée un
+    nouveau à la demande.
+    """
+
+    def __init__(self, size=3, block_resources=True, timeout=15):
+        self.size = size
+        self.block_resources = block_resources
+        self.timeout = timeout
+        self.created = []
+        self.lock = threading.Lock()
+        self._reset_slots()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _reset_slots(self):
+        # Chaque place du pool est un navigateur libre ou None (navigateur à créer)
+        self.drivers = queue.Queue()
+        for _ in range(self.size):
+            self.drivers.put(None)
+
+    def _acquire(self):
+        driver = self.drivers.get()
+        if driver is not None:
+            return driver
+        try:
+            driver = setup_driver(self.block_resources)
+        except Exception:
+            self.drivers.put(None)
+            raise
+        with self.lock:
+            self.created.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        """
+        Ferme un navigateur hors d'usage et libère sa place.
+        """
+        with self.lock:
+            if driver in self.created:
+                self.created.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        self.drivers.put(None)
+
+    def fetch(self, url, wait_selector):
+        """
+        Charge `url` et attend qu'un élément correspondant au sélecteur CSS soit présent.
+        Retourne le HTML de la page (même si l'attente expire) ou None en cas d'erreur.
+        """
+        try:
+            driver = self._acquire()
+        except Exception as e:
+            logging.error(f"Impossible de démarrer un navigateur pour {url}: {e}")
+            return None
+        try:
+            driver.get(url)
+            try:
+                WebDriverWait(driver, self.timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+                )
+            except TimeoutException:
+                logging.warning(f"Élément '{wait_selector}' absent après {self.timeout}s: {url}")
+            page_source = driver.page_source
+        except Exception as e:
+            # WebDriverException, ou erreur de connexion si le pilote a planté
+            logging.error(f"Exception lors de la récupération de {url} avec Selenium: {e}")
+            self._discard(driver)
+            return None
+        self.drivers.put(driver)
+        return page_source
+
+    def fetch_all(self, urls, wait_selector):
+        """
+        Répartit les URLs sur les navigateurs du pool ; les résultats suivent l'ordre de `urls`.
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(lambda url: self.fetch(url, wait_selector), urls))
+
+    def close(self):
+        with self.lock:
+            created, self.created = self.created, []
+        for driver in created:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+        self._reset_slots()
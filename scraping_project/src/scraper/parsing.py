@@ -0,0 +1,94 @@
+import functools
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# Sélecteurs des pages Seeking Alpha
+ARTICLE_LINK_ATTRS = {'data-test-id': 'post-list-item-title'}
+CONTENT_CLASS = 'paywall-full-content'
+
+ARTICLE_LINKS_XPATH = "//a[@data-test-id='post-list-item-title']"
+CONTENT_XPATH = f"//div[contains(concat(' ', normalize-space(@class), ' '), ' {CONTENT_CLASS} ')]"
+# Texte visible uniquement, comme get_text() de BeautifulSoup (ni scripts ni styles)
+TEXT_XPATH = ".//text()[not(ancestor::script) and not(ancestor::style)]"
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_xpath(expression):
+    """
+    Compile une expression XPath une seule fois par processus.
+    """
+    return etree.XPath(expression)
+
+
+@functools.lru_cache(maxsize=None)
+def _html_parser():
+    # Les pages sont servies en UTF-8 ; sans balise meta, lxml supposerait du latin-1
+    return lxml_html.HTMLParser(encoding='utf-8')
+
+
+def _parse(content):
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return lxml_html.fromstring(content, parser=_html_parser())
+
+
+def _joined_text(element):
+    strings = (text.strip() for text in compiled_xpath(TEXT_XPATH)(element))
+    return '\n'.join(text for text in strings if text)
+
+
+def parse_article_links(content, base_url):
+    """
+    Extrait (titre, URL complète) des liens d'articles d'une page de liste.
+    """
+    if lxml_html is None:
+        return _parse_article_links_bs4(content, base_url)
+    articles = []
+    for link in compiled_xpath(ARTICLE_LINKS_XPATH)(_parse(content)):
+        href = link.get('href')
+        if not href:
+            continue
+        full_url = href if href.startswith('http') else base_url + href
+        title = ''.join(text.strip() for text in link.itertext())
+        articles.append((title, full_url))
+    return articles
+
+
+def parse_article_content(content):
+    """
+    Extrait le texte du bloc de contenu d'un article, ou None s'il est absent.
+    """
+    if lxml_html is None:
+        return _parse_article_content_bs4(content)
+    matches = compiled_xpath(CONTENT_XPATH)(_parse(content))
+    if not matches:
+        return None
+    return _joined_text(matches[0])
+
+
+# Repli sans lxml : BeautifulSoup limité aux éléments utiles avec un SoupStrainer
+def _parse_article_links_bs4(content, base_url):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(content, 'html.parser', parse_only=SoupStrainer('a', attrs=ARTICLE_LINK_ATTRS))
+    articles = []
+    for link in soup.find_all('a'):
+        href = link.get('href')
+        if not href:
+            continue
+        full_url = href if href.startswith('http') else base_url + href
+        articles.append((link.get_text(strip=True), full_url))
+    return articles
+
+
+def _parse_article_content_bs4(content):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(content, 'html.parser', parse_only=SoupStrainer('div', class_=CONTENT_CLASS))
+    content_div = soup.find('div', class_=CONTENT_CLASS)
+    if content_div:
+        return content_div.get_text(separator='\n', strip=True)
+    return None
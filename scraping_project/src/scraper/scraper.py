@@ -0,0 +1,217 @@
+import asyncio
+import logging
+
+from .parsing import parse_article_content, parse_article_links
+from .seen_index import SeenIndex, canonical_url
+from ..utils.helpers import load_json, write_json_atomic
+
+# Site et page listant les articles
+BASE_URL = 'https://seekingalpha.com'
+NEWS_PATH = '/market-news'
+
+# Éléments attendus par les backends qui rendent la page (Selenium)
+LINKS_SELECTOR = 'a[data-test-id="post-list-item-title"]'
+CONTENT_SELECTOR = 'div.paywall-full-content'
+
+# Fin de flux entre deux étapes
+_DONE = object()
+
+
+class JsonArticleSink:
+    """
+    Destination des articles : ajoute les nouveaux articles au fichier JSON existant.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.articles = load_json(output_file, default=[])
+        self.added = 0
+
+    def known_urls(self):
+        return [article['url'] for article in self.articles]
+
+    def write(self, article):
+        self.articles.append(article)
+        self.added += 1
+
+    def close(self):
+        if self.added:
+            write_json_atomic(self.output_file, self.articles)
+            logging.info(f"{self.added} articles ajoutés à '{self.output_file}' avec succès.")
+        else:
+            logging.info("Aucun nouvel article à enregistrer.")
+
+
+class MultiSink:
+    """
+    Transmet chaque article à plusieurs destinations (stockage, index...).
+    La première fait référence pour les articles déjà enregistrés.
+    """
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    @property
+    def added(self):
+        return self.sinks[0].added
+
+    def known_urls(self):
+        return self.sinks[0].known_urls()
+
+    def write(self, article):
+        for sink in self.sinks:
+            sink.write(article)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class ScrapingPipeline:
+    """
+    Pipeline de scraping : découverte des liens -> dédoublonnage -> récupération
+    -> parsing -> stockage. Les étapes tournent en parallèle et sont reliées par
+    des files bornées : une étape lente freine les précédentes au lieu de laisser
+    s'accumuler les pages en mémoire.
+    """
+
+    def __init__(self, backend, sink, seen_index, base_url=BASE_URL, news_path=NEWS_PATH,
+                 fetch_workers=4, parse_workers=2, queue_size=16):
+        self.backend = backend
+        self.sink = sink
+        self.seen_index = seen_index
+        self.base_url = base_url
+        self.news_path = news_path
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+
+    @property
+    def listing_url(self):
+        return self.base_url + self.news_path
+
+    async def fetch_listing(self):
+        """
+        Récupère la page listant les articles par une requête conditionnelle.
+        Retourne (statut, en-têtes, contenu) ; statut 304 si elle n'a pas changé.
+        Ses validateurs ne sont enregistrés qu'une fois tous ses articles récupérés
+        (voir `run`).
+        """
+        result = await self.backend.fetch(self.listing_url,
+                                          headers=self.seen_index.conditional_headers(self.listing_url),
+                                          wait_for=LINKS_SELECTOR)
+        if result is None:
+            return None, None, None
+        return result
+
+    async def dedupe(self, links, url_queue):
+        """
+        Étape de dédoublonnage : seules les URLs jamais vues (index persistant et
+        passage en cours) sont envoyées à la récupération.
+        """
+        queued = set()
+        for title, full_url in links:
+            canonical = canonical_url(full_url)
+            if full_url in self.seen_index or canonical in queued:
+                continue
+            queued.add(canonical)
+            logging.info(f"Traitement de l'article: {title} - URL: {full_url}")
+            await url_queue.put((title, full_url))
+        logging.info(f"{len(queued)} nouveaux articles, {len(links) - len(queued)} déjà vus.")
+        for _ in range(self.fetch_workers):
+            await url_queue.put(_DONE)
+
+    async def fetch_stage(self, url_queue, page_queue):
+        while (item := await url_queue.get()) is not _DONE:
+            title, full_url = item
+            result = await self.backend.fetch(full_url, wait_for=CONTENT_SELECTOR)
+            if result is None:
+                logging.warning(f"Contenu non disponible pour l'article: {title}")
+                continue
+            status, _, content = result
+            if status != 200:
+                logging.error(f"Erreur lors de la requête de l'article {full_url}: {status}")
+                continue
+            await page_queue.put((title, full_url, content))
+
+    async def parse_stage(self, page_queue, article_queue):
+        while (item := await page_queue.get()) is not _DONE:
+            title, full_url, content = item
+            text = await asyncio.to_thread(parse_article_content, content)
+            if not text:
+                logging.warning(f"Contenu non trouvé pour l'article: {full_url}")
+                continue
+            await article_queue.put({'titre': title, 'url': full_url, 'contenu': text})
+
+    async def storage_stage(self, article_queue):
+        while (article := await article_queue.get()) is not _DONE:
+            self.sink.write(article)
+            self.seen_index.record(article['url'])
+
+    async def run(self):
+        """
+        Exécute un passage complet. Retourne le nombre de nouveaux articles enregistrés,
+        0 si la liste n'a pas changé, None si elle n'a pas pu être récupérée.
+        """
+        async with self.backend:
+            status, listing_headers, listing = await self.fetch_listing()
+            if status == 304:
+                logging.info("Page principale inchangée depuis le dernier passage.")
+                self.seen_index.save()
+                return 0
+            if status != 200 or not listing:
+                logging.error(f"Impossible de récupérer la page principale ({status}). Arrêt du scraping.")
+                return None
+            logging.info("Page principale récupérée avec succès.")
+
+            links = parse_article_links(listing, self.base_url)
+            if not links:
+                logging.warning("Aucun lien d'article trouvé sur la page principale.")
+                return 0
+
+            url_queue = asyncio.Queue(self.queue_size)
+            page_queue = asyncio.Queue(self.queue_size)
+            article_queue = asyncio.Queue(self.queue_size)
+
+            async def fetchers():
+                await asyncio.gather(*(self.fetch_stage(url_queue, page_queue) for _ in range(self.fetch_workers)))
+                for _ in range(self.parse_workers):
+                    await page_queue.put(_DONE)
+
+            async def parsers():
+                await asyncio.gather(*(self.parse_stage(page_queue, article_queue) for _ in range(self.parse_workers)))
+                await article_queue.put(_DONE)
+
+            await asyncio.gather(
+                self.dedupe(links, url_queue),
+                fetchers(),
+                parsers(),
+                self.storage_stage(article_queue),
+            )
+
+        # La page principale n'est validée que si tous ses articles sont enregistrés :
+        # sinon le prochain passage la redemande sans condition et retente les échecs.
+        missing = len({canonical_url(full_url) for _, full_url in links if full_url not in self.seen_index})
+        if missing:
+            logging.warning(f"{missing} articles non récupérés, nouvel essai au prochain passage.")
+            self.seen_index.forget(self.listing_url)
+        else:
+            self.seen_index.record(self.listing_url, listing_headers)
+        self.sink.close()
+        self.seen_index.save()
+        return self.sink.added
+
+
+async def scrape(backend, output_file='articles_with_content.json', index_file='seen_urls.json',
+                 base_url=BASE_URL, fetch_workers=4, sink=None):
+    """
+    Lance un passage du pipeline avec le backend donné et un index des URLs vues.
+    """
+    sink = sink or JsonArticleSink(output_file)
+    seen_index = SeenIndex(index_file)
+    if not len(seen_index):
+        # Premier passage avec l'index : les articles déjà enregistrés comptent comme vus
+        for url in sink.known_urls():
+            seen_index.record(url)
+    pipeline = ScrapingPipeline(backend, sink, seen_index, base_url=base_url, fetch_workers=fetch_workers)
+    return await pipeline.run()
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from ..utils.helpers import load_json, write_json_atomic
+
+
+def canonical_url(url):
+    """
+    Normalise une URL d'article : le fragment (#source=...) varie selon la position
+    du lien dans la liste et ne doit pas créer de doublon.
+    """
+    return urlsplit(url)._replace(fragment='').geturl()
+
+
+class SeenIndex:
+    """
+    Index persistant des URLs déjà récupérées. Les validateurs HTTP (ETag /
+    Last-Modified) ne sont gardés que pour les pages revalidées par une requête
+    conditionnelle (la page listant les articles) : un article vu n'est jamais
+    redemandé.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = load_json(path, default={})
+
+    def __contains__(self, url):
+        return canonical_url(url) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def conditional_headers(self, url):
+        """
+        En-têtes If-None-Match / If-Modified-Since pour revalider une URL connue.
+        """
+        entry = self.entries.get(canonical_url(url), {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, url, response_headers=None):
+        entry = {'fetched_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}
+        if response_headers is not None:
+            entry['etag'] = response_headers.get('ETag')
+            entry['last_modified'] = response_headers.get('Last-Modified')
+        self.entries[canonical_url(url)] = entry
+
+    def forget(self, url):
+        self.entries.pop(canonical_url(url), None)
+
+    def save(self):
+        write_json_atomic(self.path, self.entries)
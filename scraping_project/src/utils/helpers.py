@@ -0,0 +1,41 @@
+import os
+import json
+import logging
+
+
+def setup_logging(log_file=None, level=logging.INFO):
+    """
+    Configure le logging du scraper (console et, si fourni, fichier).
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        handlers=handlers
+    )
+
+
+def load_json(path, default=None):
+    """
+    Charge un fichier JSON, ou retourne `default` s'il est absent ou illisible.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+    except FileNotFoundError:
+        return default
+    except json.JSONDecodeError as e:
+        logging.error(f"Erreur de décodage JSON lors de la lecture du fichier {path}: {e}")
+        return default
+
+
+def write_json_atomic(path, data, indent=4):
+    """
+    Écrit un fichier JSON de façon atomique (fichier temporaire puis renommage).
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
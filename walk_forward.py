@@ -0,0 +1,139 @@
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from main import FEATURE_COLUMNS, get_spy_data, make_windows
+
+
+def make_folds(n_samples, n_folds=20, test_size=20, train_size=None, window_size=60):
+    """
+    Découpe la série en plis walk-forward.
+    Les plis de test se suivent à la fin de la série ; la fenêtre d'entraînement
+    glisse avec eux (taille fixe `train_size`, par défaut tout l'historique disponible
+    avant le premier pli).
+    Retourne une liste de tuples (train_start, train_end, test_end).
+    """
+    first_test = n_samples - n_folds * test_size
+    if train_size is None:
+        train_size = first_test
+    if first_test < train_size or train_size <= window_size:
+        raise ValueError(
+            f"Pas assez de données ({n_samples} lignes) pour {n_folds} plis de {test_size} jours "
+            f"avec {train_size} jours d'entraînement et une fenêtre de {window_size}."
+        )
+
+    folds = []
+    for k in range(n_folds):
+        train_end = first_test + k * test_size
+        folds.append((train_end - train_size, train_end, train_end + test_size))
+    return folds
+
+
+def init_worker(threads):
+    """
+    Limite les threads TensorFlow/BLAS de chaque processus pour que les plis
+    parallèles ne se disputent pas les cœurs.
+    """
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _inverse_close(scaler, values):
+    """
+    Dé-normalise la colonne 'Close' (colonne 0) d'un MinMaxScaler ajusté sur toutes les features.
+    """
+    return (np.asarray(values).ravel() - scaler.min_[0]) / scaler.scale_[0]
+
+
+def evaluate_fold(fold_id, features, bounds, window_size=60, epochs=150, batch_size=32, seed=42):
+    """
+    Entraîne le modèle sur la partie entraînement d'un pli et mesure l'erreur de
+    prévision à un jour sur la partie test.
+    """
+    import tensorflow as tf
+    from sklearn.preprocessing import MinMaxScaler
+    from tensorflow.keras.callbacks import EarlyStopping
+    from main import build_lstm_model
+
+    tf.keras.utils.set_random_seed(seed + fold_id)
+    started = time.perf_counter()
+    train_start, train_end, test_end = bounds
+
+    # Le scaler ne voit que les données d'entraînement du pli
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(features[train_start:train_end])
+    scaled = scaler.transform(features[train_start:test_end])
+
+    X = make_windows(scaled, window_size)
+    y = scaled[window_size:, 0]
+
+    split = train_end - train_start - window_size
+    X_train, y_train = X[:split], y[:split]
+    X_test, y_test = X[split:], y[split:]
+
+    model = build_lstm_model((X_train.shape[1], X_train.shape[2]))
+    early_stopping = EarlyStopping(monitor='loss', patience=10, restore_best_weights=True)
+    model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, callbacks=[early_stopping], verbose=0)
+
+    predicted = _inverse_close(scaler, model.predict(X_test, verbose=0))
+    actual = _inverse_close(scaler, y_test)
+    errors = predicted - actual
+
+    return {
+        'fold': fold_id,
+        'train_start': train_start,
+        'train_end': train_end,
+        'test_end': test_end,
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'mape': float(np.mean(np.abs(errors / actual)) * 100),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_walk_forward(start_date, end_date, n_folds=20, test_size=20, train_size=None,
+                     window_size=60, epochs=150, batch_size=32, max_workers=None):
+    """
+    Évalue le modèle LSTM en walk-forward : chaque pli est entraîné et évalué
+    dans un processus séparé du pool.
+    """
+    spy_data = get_spy_data(start_date, end_date).dropna().reset_index(drop=True)
+    features = spy_data[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    folds = make_folds(len(features), n_folds, test_size, train_size, window_size)
+
+    cpu_count = os.cpu_count() or 1
+    max_workers = max_workers or min(n_folds, cpu_count)
+    threads = max(1, cpu_count // max_workers)
+    print(f"Walk-forward sur {n_folds} plis avec {max_workers} processus ({threads} thread(s) chacun)...")
+
+    # 'spawn' : TensorFlow ne supporte pas d'être dupliqué par fork
+    context = mp.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=init_worker, initargs=(threads,)) as executor:
+        futures = [
+            executor.submit(evaluate_fold, k, features, bounds, window_size, epochs, batch_size)
+            for k, bounds in enumerate(folds)
+        ]
+        results = [future.result() for future in futures]
+
+    report = pd.DataFrame(results)
+    dates = spy_data['Date']
+    report['test_from'] = dates.iloc[report['train_end']].to_numpy()
+    report['test_to'] = dates.iloc[report['test_end'] - 1].to_numpy()
+    return report[['fold', 'test_from', 'test_to', 'rmse', 'mae', 'mape', 'seconds']]
+
+
+if __name__ == "__main__":
+    start_date = '2015-01-01'
+    end_date = '2024-01-01'
+    report = run_walk_forward(start_date, end_date)
+    print("Erreur de prévision par pli:")
+    print(report.to_string(index=False))
+    print(f"RMSE moyen: {report['rmse'].mean():.4f} - MAE moyen: {report['mae'].mean():.4f} - MAPE moyen: {report['mape'].mean():.2f}%")